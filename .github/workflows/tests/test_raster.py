@@ -1,5 +1,8 @@
 """test EOapi."""
 
+import asyncio
+import time
+
 import httpx
 
 raster_endpoint = "http://0.0.0.0:8082"
@@ -247,3 +250,27 @@ def test_cog_endpoints():
     )
     assert resp.status_code == 200
     assert resp.headers["content-type"] == "application/json"
+
+
+def test_adaptive_pool():
+    """test the resizing of the database pool."""
+    url = (
+        f"{raster_endpoint}/collections/noaa-emergency-response/-85.6358,36.1624/assets"
+    )
+
+    async def _requests():
+        async with httpx.AsyncClient(timeout=30) as client:
+            return await asyncio.gather(*[client.get(url) for _ in range(20)])
+
+    responses = asyncio.run(_requests())
+    assert [resp.status_code for resp in responses] == [200] * 20
+
+    # the pool of one connection grows after requests waited for it
+    for _ in range(30):
+        pool = httpx.get(f"{raster_endpoint}/_mgmt/pool").json()
+        if pool["max_size"] >= 2:
+            break
+        time.sleep(0.1)
+    assert pool["max_size"] >= 2
+    assert pool["min_size"] == pool["max_size"]
+    assert pool["queued"] > 0
@@ -1,8 +1,19 @@
 """test EOapi."""
 
+import asyncio
+import base64
+import json
+import math
+import secrets
+import time
+from urllib.parse import parse_qs, urlsplit
+
 import httpx
 
 stac_endpoint = "http://0.0.0.0:8081"
+# instance without cache
+guarded_stac_endpoint = "http://0.0.0.0:8084"
+jaeger_endpoint = "http://0.0.0.0:16686"
 
 
 def test_stac_api():
@@ -51,3 +62,764 @@ def test_stac_to_raster():
         params={"assets": "cog"},
     )
     assert resp.status_code == 307
+
+
+def test_stac_batch_search():
+    """test batch search."""
+    searches = [
+        {"collections": ["noaa-emergency-response"], "limit": 2},
+        {
+            "collections": ["noaa-emergency-response"],
+            "ids": ["20200307aC0853300w361200"],
+        },
+    ]
+    resp = httpx.post(f"{stac_endpoint}/search/batch", json={"searches": searches})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert len(results) == 2
+    assert len(results[0]["features"]) == 2
+    assert results[1]["features"][0]["id"] == "20200307aC0853300w361200"
+
+    resp = httpx.post(f"{stac_endpoint}/search/batch", json={"searches": []})
+    assert resp.status_code == 400
+
+
+def test_stac_batch_items():
+    """test batch items."""
+    items = [
+        {"collection": "noaa-emergency-response", "id": "20200307aC0853300w361200"},
+        {"collection": "noaa-emergency-response", "id": "unknown-item"},
+    ]
+    resp = httpx.post(f"{stac_endpoint}/items/batch", json={"items": items})
+    assert resp.status_code == 200
+    features = resp.json()["features"]
+    assert len(features) == 1
+    assert features[0]["id"] == "20200307aC0853300w361200"
+
+
+def test_stac_batch_items_shared_ids():
+    """test batch items of collections sharing item ids."""
+    collection = {
+        "type": "Collection",
+        "stac_version": "1.0.0",
+        "description": "batch items",
+        "license": "proprietary",
+        "extent": {
+            "spatial": {"bbox": [[-180, -90, 180, 90]]},
+            "temporal": {"interval": [[None, None]]},
+        },
+        "links": [],
+    }
+    item = {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "geometry": {"type": "Point", "coordinates": [-86.78, 36.16]},
+        "bbox": [-86.78, 36.16, -86.78, 36.16],
+        "properties": {"datetime": "2020-03-07T00:00:00Z"},
+        "links": [],
+        "assets": {},
+    }
+    collection_ids = ["test-batch-a", "test-batch-b"]
+    for collection_id in collection_ids:
+        resp = httpx.post(
+            f"{stac_endpoint}/collections", json={**collection, "id": collection_id}
+        )
+        assert resp.status_code in (200, 201, 409)
+        for item_id in ("shared-1", "shared-2"):
+            resp = httpx.post(
+                f"{stac_endpoint}/collections/{collection_id}/items",
+                json={**item, "id": item_id, "collection": collection_id},
+            )
+            assert resp.status_code in (200, 201, 409)
+
+    try:
+        items = [
+            {"collection": "test-batch-a", "id": "shared-1"},
+            {"collection": "test-batch-b", "id": "shared-2"},
+        ]
+        # the instance without cache fetches all the items from the database
+        resp = httpx.post(f"{guarded_stac_endpoint}/items/batch", json={"items": items})
+        assert resp.status_code == 200
+        features = [
+            {"collection": feature["collection"], "id": feature["id"]}
+            for feature in resp.json()["features"]
+        ]
+        assert features == items
+    finally:
+        for collection_id in collection_ids:
+            httpx.delete(f"{stac_endpoint}/collections/{collection_id}")
+
+
+def test_stac_search_bbox():
+    """test searches sharing the result of their rounded bbox."""
+    bbox = [-85.64, 36.15, -85.62, 36.17]
+    resp = httpx.get(
+        f"{stac_endpoint}/search",
+        params={
+            "collections": "noaa-emergency-response",
+            "bbox": ",".join(map(str, bbox)),
+        },
+    )
+    assert resp.status_code == 200
+    features = resp.json()["features"]
+    assert features
+    for feature in features:
+        minx, miny, maxx, maxy = feature["bbox"]
+        assert minx <= bbox[2] and maxx >= bbox[0]
+        assert miny <= bbox[3] and maxy >= bbox[1]
+
+    # the rounded bbox finds more items
+    resp = httpx.get(
+        f"{stac_endpoint}/search",
+        params={
+            "collections": "noaa-emergency-response",
+            "bbox": "-85.7,36.1,-85.6,36.2",
+        },
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["features"]) >= len(features)
+
+    resp = httpx.post(
+        f"{stac_endpoint}/search",
+        json={"collections": ["noaa-emergency-response"], "bbox": bbox, "limit": 1},
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["features"]) <= 1
+    for link in resp.json()["links"]:
+        if link["rel"] == "next":
+            assert link["body"]["bbox"] == bbox
+
+    params = {
+        "collections": "noaa-emergency-response",
+        "bbox": ",".join(map(str, bbox)),
+        "limit": 1,
+    }
+    resp = httpx.get(f"{stac_endpoint}/search", params=params)
+    assert resp.status_code == 200
+    for link in resp.json()["links"]:
+        if link["rel"] == "next":
+            query = parse_qs(urlsplit(link["href"]).query)
+            assert query["bbox"] == [params["bbox"]]
+            assert query["collections"] == [params["collections"]]
+            assert query["limit"] == ["1"]
+
+
+def test_stac_collections_pagination():
+    """test keyset pagination of collection searches."""
+    for collection_id in ("test-pagination-1", "test-pagination-2"):
+        collection = {
+            "type": "Collection",
+            "stac_version": "1.0.0",
+            "id": collection_id,
+            "description": "pagination test",
+            "license": "proprietary",
+            "extent": {
+                "spatial": {"bbox": [[-180, -90, 180, 90]]},
+                "temporal": {"interval": [[None, None]]},
+            },
+            "links": [],
+        }
+        resp = httpx.post(f"{stac_endpoint}/collections", json=collection)
+        assert resp.status_code in (200, 201, 409)
+
+    ids = "noaa-emergency-response,test-pagination-1,test-pagination-2"
+    resp = httpx.get(f"{stac_endpoint}/collections", params={"ids": ids, "limit": 1})
+    assert resp.status_code == 200
+    pages = [resp.json()]
+    links = {link["rel"]: link["href"] for link in resp.json()["links"]}
+    assert "previous" not in links
+    while "next" in links:
+        resp = httpx.get(links["next"])
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        links = {link["rel"]: link["href"] for link in resp.json()["links"]}
+    assert [page["collections"][0]["id"] for page in pages] == ids.split(",")
+
+    # back to the first page
+    resp = httpx.get(links["previous"])
+    assert resp.status_code == 200
+    assert resp.json()["collections"][0]["id"] == "test-pagination-1"
+    links = {link["rel"]: link["href"] for link in resp.json()["links"]}
+    resp = httpx.get(links["previous"])
+    assert resp.status_code == 200
+    assert resp.json()["collections"][0]["id"] == "noaa-emergency-response"
+    assert "previous" not in {link["rel"] for link in resp.json()["links"]}
+
+    # the ids are kept to build the tokens
+    resp = httpx.get(
+        f"{stac_endpoint}/collections", params={"ids": ids, "limit": 1, "fields": "-id"}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["collections"][0]["id"] == "noaa-emergency-response"
+    assert "next" in {link["rel"] for link in resp.json()["links"]}
+
+
+def test_stac_collections_tampered_token():
+    """test the rejection of invalid pagination tokens."""
+    pages = [
+        {"offset": -1},
+        {"offset": "1"},
+        {"offset": True},
+        {"after": 1},
+        {"before": None},
+        ["noaa-emergency-response"],
+    ]
+    for page in pages:
+        token = base64.urlsafe_b64encode(json.dumps(page).encode()).decode()
+        resp = httpx.get(f"{stac_endpoint}/collections", params={"token": token})
+        assert resp.status_code == 400, page
+
+    resp = httpx.get(f"{stac_endpoint}/collections", params={"token": "not a token"})
+    assert resp.status_code == 400
+
+
+def test_stac_rate_limit():
+    """test the token bucket of a request entity."""
+    # a client IP of its own, the other tests keep their tokens
+    headers = {"Origin": "http://example.com", "X-Forwarded-For": "192.0.2.1"}
+
+    # preflight requests don't take tokens
+    for _ in range(110):
+        resp = httpx.options(
+            f"{stac_endpoint}/collections",
+            headers={**headers, "Access-Control-Request-Method": "GET"},
+        )
+        assert resp.status_code == 200
+
+    async def _requests():
+        async with httpx.AsyncClient() as client:
+            return await asyncio.gather(
+                *[
+                    # the entity header is chosen by the client, it doesn't change the bucket
+                    client.get(
+                        f"{stac_endpoint}/collections",
+                        headers={**headers, "X-Request-Entity": str(i)},
+                    )
+                    for i in range(150)
+                ]
+            )
+
+    responses = asyncio.run(_requests())
+    statuses = [resp.status_code for resp in responses]
+    assert 90 <= statuses.count(200) < 150
+    rejected = next(resp for resp in responses if resp.status_code == 429)
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert rejected.headers["Access-Control-Allow-Origin"] == "*"
+
+    # other clients keep their tokens
+    resp = httpx.get(
+        f"{stac_endpoint}/collections", headers={"X-Forwarded-For": "192.0.2.2"}
+    )
+    assert resp.status_code == 200
+
+
+def test_stac_conditional_requests():
+    """test ETag validation of the responses."""
+    url = f"{stac_endpoint}/collections/noaa-emergency-response"
+    headers = {"Origin": "http://example.com"}
+
+    resp = httpx.get(url, headers={**headers, "Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert resp.headers["Cache-Control"]
+
+    # the ETag is computed before compression, whatever the encoding
+    resp = httpx.get(url, headers={**headers, "Accept-Encoding": "br"})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == etag
+
+    resp = httpx.get(
+        url, headers={**headers, "Accept-Encoding": "br", "If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.headers["Access-Control-Allow-Origin"] == "*"
+    assert not resp.content
+
+    resp = httpx.get(url, headers={"If-None-Match": 'W/"other"'})
+    assert resp.status_code == 200
+
+
+def test_stac_collection_invalidation():
+    """test the cached collection responses after collection changes.
+
+    The changes invalidate the cached collections, then warm the cache up again.
+    """
+    collection = {
+        "type": "Collection",
+        "stac_version": "1.0.0",
+        "id": "test-invalidation",
+        "description": "before",
+        "license": "proprietary",
+        "extent": {
+            "spatial": {"bbox": [[-180, -90, 180, 90]]},
+            "temporal": {"interval": [[None, None]]},
+        },
+        "links": [],
+    }
+    url = f"{stac_endpoint}/collections/test-invalidation"
+    resp = httpx.post(f"{stac_endpoint}/collections", json=collection)
+    assert resp.status_code in (200, 201, 409)
+    resp = httpx.put(url, json=collection)
+    assert resp.status_code == 200
+
+    # cached
+    assert httpx.get(url).json()["description"] == "before"
+    params = {"ids": "test-invalidation"}
+    resp = httpx.get(f"{stac_endpoint}/collections", params=params)
+    assert resp.json()["collections"][0]["description"] == "before"
+
+    resp = httpx.put(url, json={**collection, "description": "after"})
+    assert resp.status_code == 200
+    time.sleep(1)  # warm-up
+    assert httpx.get(url).json()["description"] == "after"
+    resp = httpx.get(f"{stac_endpoint}/collections", params=params)
+    assert resp.json()["collections"][0]["description"] == "after"
+
+    resp = httpx.delete(url)
+    assert resp.status_code == 200
+    assert httpx.get(url).status_code == 404
+    resp = httpx.get(f"{stac_endpoint}/collections", params=params)
+    assert resp.json()["collections"] == []
+
+
+def test_stac_item_invalidation():
+    """test the cached searches and validators after item changes.
+
+    Item writes only invalidate the searches and responses of the items of their collection.
+    """
+    collection = {
+        "type": "Collection",
+        "stac_version": "1.0.0",
+        "id": "test-item-invalidation",
+        "description": "item invalidation",
+        "license": "proprietary",
+        "extent": {
+            "spatial": {"bbox": [[-180, -90, 180, 90]]},
+            "temporal": {"interval": [[None, None]]},
+        },
+        "links": [],
+    }
+    item = {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": "item-1",
+        "collection": "test-item-invalidation",
+        "geometry": {"type": "Point", "coordinates": [-86.78, 36.16]},
+        "bbox": [-86.78, 36.16, -86.78, 36.16],
+        "properties": {"datetime": "2020-03-07T00:00:00Z", "title": "before"},
+        "links": [],
+        "assets": {},
+    }
+    url = f"{stac_endpoint}/collections/test-item-invalidation"
+    resp = httpx.post(f"{stac_endpoint}/collections", json=collection)
+    assert resp.status_code in (200, 201, 409)
+    resp = httpx.post(f"{url}/items", json=item)
+    assert resp.status_code in (200, 201, 409)
+
+    try:
+        search = {"collections": ["test-item-invalidation"]}
+        resp = httpx.post(f"{stac_endpoint}/search", json=search)
+        assert [f["properties"]["title"] for f in resp.json()["features"]] == ["before"]
+        etag = httpx.get(url).headers["ETag"]
+
+        item["properties"]["title"] = "after"
+        resp = httpx.put(f"{url}/items/item-1", json=item)
+        assert resp.status_code == 200
+        resp = httpx.post(f"{stac_endpoint}/search", json=search)
+        assert [f["properties"]["title"] for f in resp.json()["features"]] == ["after"]
+        assert httpx.get(f"{url}/items/item-1").json()["properties"]["title"] == "after"
+        # the collection is still valid
+        assert httpx.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        resp = httpx.post(f"{url}/items", json={**item, "id": "item-2"})
+        assert resp.status_code in (200, 201)
+        resp = httpx.post(f"{stac_endpoint}/search", json=search)
+        assert sorted(f["id"] for f in resp.json()["features"]) == ["item-1", "item-2"]
+        resp = httpx.get(f"{url}/items")
+        assert sorted(f["id"] for f in resp.json()["features"]) == ["item-1", "item-2"]
+
+        resp = httpx.delete(f"{url}/items/item-2")
+        assert resp.status_code == 200
+        resp = httpx.post(f"{stac_endpoint}/search", json=search)
+        assert [f["id"] for f in resp.json()["features"]] == ["item-1"]
+    finally:
+        httpx.delete(url)
+
+
+def test_stac_cache_top_keys():
+    """test the most looked up cache keys."""
+    item = "noaa-emergency-response/items/20200307aC0853300w361200"
+    for _ in range(30):
+        assert httpx.get(f"{stac_endpoint}/collections/{item}").status_code == 200
+
+    resp = httpx.get(f"{stac_endpoint}/_mgmt/cache/keys", params={"limit": 20})
+    assert resp.status_code == 200
+    keys = resp.json()
+    assert len(keys) <= 20
+    lookups = [key["lookups"] for key in keys]
+    assert lookups == sorted(lookups, reverse=True)
+    key = "/item:noaa-emergency-response:20200307aC0853300w361200"
+    assert any(k["key"] == key and k["lookups"] >= 30 for k in keys)
+
+    for limit in (0, 201):
+        resp = httpx.get(f"{stac_endpoint}/_mgmt/cache/keys", params={"limit": limit})
+        assert resp.status_code == 400
+
+
+def test_stac_search_preload():
+    """test the preload of the most frequent searches, not run again while cached."""
+    headers = {"X-Forwarded-For": "192.0.2.9"}
+    url = f"{stac_endpoint}/_mgmt/cache/keys"
+
+    def _lookups():
+        resp = httpx.get(url, params={"limit": 200})
+        assert resp.status_code == 200
+        return {key["key"]: key["lookups"] for key in resp.json()}
+
+    before = _lookups()
+    # a search of its own, sharing the result of its rounded bbox
+    params = {
+        "collections": "noaa-emergency-response",
+        "bbox": "-89.93,30.07,-80.07,39.93",
+    }
+    for _ in range(10):
+        resp = httpx.get(f"{stac_endpoint}/search", params=params, headers=headers)
+        assert resp.status_code == 200
+    counted = _lookups()
+    key = max(counted, key=lambda k: counted[k] - before.get(k, 0))
+    assert key.startswith("/search:")
+    assert counted[key] - before.get(key, 0) >= 10
+
+    # the cached search is not run again by the preload
+    time.sleep(3)
+    assert _lookups()[key] == counted[key]
+
+
+def test_stac_search_prefetch():
+    """test the prefetch of the next page of item searches."""
+    headers = {"X-Forwarded-For": "192.0.2.3"}
+    # a search of its own, not cached yet
+    params = {
+        "collections": "noaa-emergency-response",
+        "datetime": "2020-03-01T00:00:00Z/2020-03-31T00:00:00Z",
+        "limit": 2,
+    }
+    resp = httpx.get(f"{stac_endpoint}/search", params=params, headers=headers)
+    assert resp.status_code == 200
+    links = {link["rel"]: link for link in resp.json()["links"]}
+    time.sleep(1)  # prefetch
+
+    stats = httpx.get(f"{stac_endpoint}/_mgmt/cache").json()
+    hits = stats.get("/search", {}).get("hits", 0)
+    resp = httpx.get(links["next"]["href"], headers=headers)
+    assert resp.status_code == 200
+    assert len(resp.json()["features"]) == 2
+    stats = httpx.get(f"{stac_endpoint}/_mgmt/cache").json()
+    assert stats["/search"]["hits"] == hits + 1
+
+
+def test_stac_collections_links():
+    """test the links of the collections, by base URL."""
+    for host in ("catalog.example.com", "stac.example.org"):
+        headers = {
+            "X-Forwarded-Host": host,
+            "X-Forwarded-Proto": "https",
+            "X-Forwarded-Port": "443",
+        }
+        # the responses of the instance without cache are built for each request
+        resp = httpx.get(
+            f"{guarded_stac_endpoint}/collections",
+            params={"ids": "noaa-emergency-response"},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        collections = resp.json()["collections"]
+        assert len(collections) == 1
+        links = {link["rel"]: link["href"] for link in collections[0]["links"]}
+        base_url = f"https://{host}"
+        collection_url = f"{base_url}/collections/noaa-emergency-response"
+        assert links["self"] == collection_url
+        assert links["items"] == f"{collection_url}/items"
+        assert links["parent"] == f"{base_url}/"
+        assert links["root"] == f"{base_url}/"
+        queryables = "http://www.opengis.net/def/rel/ogc/1.0/queryables"
+        assert links[queryables] == f"{collection_url}/queryables"
+
+
+def test_stac_collections_free_text():
+    """test the free-text collection search, sorted by relevance."""
+    collection = {
+        "type": "Collection",
+        "stac_version": "1.0.0",
+        "license": "proprietary",
+        "extent": {
+            "spatial": {"bbox": [[-180, -90, 180, 90]]},
+            "temporal": {"interval": [[None, None]]},
+        },
+        "links": [],
+    }
+    collections = [
+        {
+            **collection,
+            "id": "test-free-text-description",
+            "description": "Aerial imagery of Zanzibar",
+        },
+        {
+            **collection,
+            "id": "test-free-text-title",
+            "title": "Zanzibar",
+            "description": "Aerial imagery",
+        },
+    ]
+    for c in collections:
+        resp = httpx.post(f"{stac_endpoint}/collections", json=c)
+        assert resp.status_code in (200, 201, 409)
+
+    try:
+        url = f"{guarded_stac_endpoint}/collections"
+        # title matches rank before description matches
+        resp = httpx.get(url, params={"q": "zanzibar"})
+        assert resp.status_code == 200
+        ids = [c["id"] for c in resp.json()["collections"]]
+        assert ids == ["test-free-text-title", "test-free-text-description"]
+
+        params = {"q": "zanzibar", "ids": "test-free-text-description"}
+        resp = httpx.get(url, params=params)
+        ids = [c["id"] for c in resp.json()["collections"]]
+        assert ids == ["test-free-text-description"]
+
+        resp = httpx.get(url, params={"q": "madagascar"})
+        assert resp.status_code == 200
+        assert resp.json()["collections"] == []
+    finally:
+        for c in collections:
+            httpx.delete(f"{stac_endpoint}/collections/{c['id']}")
+
+
+def _polygon(points):
+    """polygon of a number of points around Nashville."""
+    ring = [
+        [
+            -86.78 + 0.1 * math.cos(2 * math.pi * i / points),
+            36.16 + 0.1 * math.sin(2 * math.pi * i / points),
+        ]
+        for i in range(points - 1)
+    ]
+    return {"type": "Polygon", "coordinates": [ring + [ring[0]]]}
+
+
+def test_stac_search_max_points():
+    """test the rejection of searches intersecting geometries with too many points."""
+    headers = {"X-Forwarded-For": "192.0.2.4"}
+    body = {"collections": ["noaa-emergency-response"], "intersects": _polygon(1001)}
+    resp = httpx.post(f"{stac_endpoint}/search", json=body, headers=headers)
+    assert resp.status_code == 400
+    assert "1001 points" in resp.json()["detail"]
+
+    # the points of all the geometries of a collection
+    geometries = [_polygon(1000), {"type": "Point", "coordinates": [-86.78, 36.16]}]
+    body["intersects"] = {"type": "GeometryCollection", "geometries": geometries}
+    resp = httpx.post(f"{stac_endpoint}/search", json=body, headers=headers)
+    assert resp.status_code == 400
+    assert "1001 points" in resp.json()["detail"]
+
+    body["intersects"] = _polygon(100)
+    resp = httpx.post(f"{stac_endpoint}/search", json=body, headers=headers)
+    assert resp.status_code == 200
+
+
+def test_stac_search_cost():
+    """test the admission of item searches by their estimated cost."""
+    # rejected above the maximum cost
+    body = {"collections": ["noaa-emergency-response"], "limit": 1}
+    resp = httpx.post(f"{guarded_stac_endpoint}/search", json=body)
+    assert resp.status_code == 400
+    assert "too expensive" in resp.json()["detail"]
+
+    # queued above the expensive cost, two at once
+    headers = {"X-Forwarded-For": "192.0.2.4"}
+
+    async def _requests():
+        async with httpx.AsyncClient(timeout=30) as client:
+            return await asyncio.gather(
+                *[
+                    # searches of their own, not cached yet
+                    client.post(
+                        f"{stac_endpoint}/search",
+                        json={**body, "bbox": [-90 - i, 30, -80, 40]},
+                        headers=headers,
+                    )
+                    for i in range(8)
+                ]
+            )
+
+    responses = asyncio.run(_requests())
+    assert [resp.status_code for resp in responses] == [200] * 8
+
+
+def test_stac_reader_pools():
+    """test the balance of the reads between the readers."""
+    headers = {"X-Forwarded-For": "192.0.2.5"}
+
+    async def _requests():
+        async with httpx.AsyncClient(timeout=30) as client:
+            return await asyncio.gather(
+                *[
+                    # searches of their own, not cached yet
+                    client.get(
+                        f"{stac_endpoint}/search",
+                        params={
+                            "collections": "noaa-emergency-response",
+                            "bbox": f"{-90 - i},20,-80,40",
+                            "limit": 1,
+                        },
+                        headers=headers,
+                    )
+                    for i in range(10)
+                ]
+            )
+
+    responses = asyncio.run(_requests())
+    assert [resp.status_code for resp in responses] == [200] * 10
+
+    resp = httpx.get(f"{stac_endpoint}/_mgmt/pool")
+    assert resp.status_code == 200
+    pools = resp.json()
+    assert pools["reader"]["acquisitions"] > 0
+    assert pools["database"]["acquisitions"] > 0
+
+
+def test_stac_lagging_readers():
+    """test the reads going to the writer when all the readers lag."""
+    headers = {"X-Forwarded-For": "192.0.2.8"}
+    url = f"{guarded_stac_endpoint}/_mgmt/pool"
+    before = httpx.get(url).json()
+    # the instance without cache reads from the database for each request
+    for _ in range(3):
+        resp = httpx.get(f"{guarded_stac_endpoint}/collections", headers=headers)
+        assert resp.status_code == 200
+
+    after = httpx.get(url).json()
+    assert after["writer"]["acquisitions"] >= before["writer"]["acquisitions"] + 3
+    for name in ("reader", "database"):
+        assert after[name]["acquisitions"] == before[name]["acquisitions"]
+
+
+def test_stac_prepared_statements():
+    """test the repeated pgstac calls, reusing their prepared statements."""
+    url = f"{guarded_stac_endpoint}/collections"
+    searches = [
+        {},
+        {"ids": "noaa-emergency-response"},
+        {"bbox": "-87,36,-86,37", "limit": 1},
+        {"sortby": "-id", "limit": 2},
+    ]
+    # the instance without cache queries the database for each request
+    for params in searches:
+        first = httpx.get(url, params=params)
+        assert first.status_code == 200
+        for _ in range(5):
+            resp = httpx.get(url, params=params)
+            assert resp.status_code == 200
+            assert resp.json() == first.json()
+
+    resp = httpx.get(url, params={"ids": "noaa-emergency-response"})
+    ids = [c["id"] for c in resp.json()["collections"]]
+    assert ids == ["noaa-emergency-response"]
+
+    # the estimated cost of item searches
+    body = {"collections": ["noaa-emergency-response"], "limit": 1}
+    for _ in range(5):
+        resp = httpx.post(f"{guarded_stac_endpoint}/search", json=body)
+        assert resp.status_code == 400
+
+
+def test_stac_precomputed_queryables():
+    """test the precomputed queryables, validated by the digest of their content."""
+    for url in (
+        f"{stac_endpoint}/queryables",
+        f"{stac_endpoint}/collections/noaa-emergency-response/queryables",
+    ):
+        resp = httpx.get(url)
+        assert resp.status_code == 200
+        assert resp.json()["$id"] == url
+        # the digest leaves the `$id` out
+        etag = resp.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        resp = httpx.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+        assert not resp.content
+
+        # weak comparison of the listed ETags
+        for if_none_match in (f'"other", {etag}', etag.removeprefix("W/")):
+            resp = httpx.get(url, headers={"If-None-Match": if_none_match})
+            assert resp.status_code == 304
+
+
+def test_stac_server_timing():
+    """test the durations of the steps of the requests."""
+    headers = {"X-Forwarded-For": "192.0.2.6"}
+    # a search of its own, not cached yet
+    body = {"collections": ["noaa-emergency-response"], "bbox": [-91, 29, -80, 40]}
+
+    def _steps(resp):
+        assert resp.status_code == 200
+        metrics = resp.headers["Server-Timing"].split(", ")
+        assert metrics[-1].startswith("total;dur=")
+        return {metric.split(";")[0] for metric in metrics}
+
+    resp = httpx.post(f"{stac_endpoint}/search", json=body, headers=headers)
+    assert {"cache", "db", "search"} <= _steps(resp)
+
+    resp = httpx.post(f"{stac_endpoint}/search", json=body, headers=headers)
+    steps = _steps(resp)
+    assert "cache" in steps
+    assert "db" not in steps
+
+
+def test_stac_trace_sampling():
+    """test the tracing of the requests of sampled traces only."""
+    url = f"{stac_endpoint}/collections/noaa-emergency-response"
+    # the caller sampled its trace
+    trace_id = secrets.token_hex(16)
+    traceparent = f"00-{trace_id}-{secrets.token_hex(8)}-01"
+    assert httpx.get(url, headers={"traceparent": traceparent}).status_code == 200
+
+    # exported in batches
+    for _ in range(20):
+        resp = httpx.get(f"{jaeger_endpoint}/api/traces/{trace_id}")
+        if resp.status_code == 200:
+            break
+        time.sleep(0.5)
+    assert resp.status_code == 200
+    spans = resp.json()["data"][0]["spans"]
+    assert "main" in [span["operationName"] for span in spans]
+    assert len(spans) > 1
+    assert {int(span["traceID"], 16) for span in spans} == {int(trace_id, 16)}
+
+    # the caller left its trace out
+    trace_id = secrets.token_hex(16)
+    traceparent = f"00-{trace_id}-{secrets.token_hex(8)}-00"
+    assert httpx.get(url, headers={"traceparent": traceparent}).status_code == 200
+    time.sleep(2)
+    resp = httpx.get(f"{jaeger_endpoint}/api/traces/{trace_id}")
+    assert resp.status_code == 404
+
+
+def test_stac_event_loop_blocks():
+    """test the detection of the callbacks blocking the event loop."""
+    headers = {"X-Forwarded-For": "192.0.2.7"}
+    # parsing the geometry blocks the event loop, before its rejection
+    body = {"collections": ["noaa-emergency-response"], "intersects": _polygon(200_000)}
+    resp = httpx.post(f"{stac_endpoint}/search", json=body, headers=headers, timeout=30)
+    assert resp.status_code == 400
+
+    resp = httpx.get(f"{stac_endpoint}/metrics")
+    assert resp.status_code == 200
+    assert 'event_loop_blocks_total{route="/search"}' in resp.text
+    assert "event_loop_lag_seconds_bucket" in resp.text
+    assert 'event_loop_lag_quantile_seconds{quantile="0.99"}' in resp.text
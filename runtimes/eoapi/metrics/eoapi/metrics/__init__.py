@@ -0,0 +1,3 @@
+"""eoapi.metrics."""
+
+__version__ = "0.1.0"
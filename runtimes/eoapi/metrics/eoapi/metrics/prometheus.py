@@ -0,0 +1,295 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Prometheus metrics shared by the runtimes, exposed on `/metrics`:
+- latency, response size and in flight HTTP requests by route template, measured by
+  `MetricsMiddleware`,
+- event loop lag and its recent percentiles, measured by `EventLoopLagProbe`, and the callbacks
+  blocking the event loop by route, detected by `BlockingCallDetector`,
+- the statistics of the instance (cache, database pools, rate limiting), collected on each scrape
+  by `StatisticsCollector`.
+
+The `metrics` module of each runtime adapts them: its `StatisticsCollector` lists the statistics
+exported as counters, and its `MetricsMiddleware` may record metrics of its own by response.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import FrameType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests.",
+    ["method", "route", "status"],
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the HTTP response bodies.",
+    ["route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed.")
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of the event loop lag probes.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+EVENT_LOOP_LAG_QUANTILES = Gauge(
+    "event_loop_lag_quantile_seconds",
+    "Percentiles of the delay of the last event loop lag probes.",
+    ["quantile"],
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks",
+    "Callbacks blocking the event loop longer than the threshold, by route.",
+    ["route"],
+)
+
+# interval in seconds between two event loop lag probes
+LAG_PROBE_INTERVAL = 0.5
+# number of the last probes the lag percentiles are computed from
+LAG_PROBE_WINDOW = 120
+LAG_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route of the request, which bounds the cardinality of the metrics."""
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # the route is set in the scope by the router
+            self.observe(route_template(scope), scope["method"], status, size, start)
+
+    def observe(self, route: str, method: str, status: int, size: int, start: float) -> None:
+        """Record a response to a request started at `start`."""
+        REQUEST_DURATION.labels(method, route, str(status)).observe(time.perf_counter() - start)
+        RESPONSE_SIZE.labels(route).observe(size)
+
+
+def frame_route(frame: Optional[FrameType]) -> str:
+    """
+    Route template of the request served by the code of a frame, from the ASGI scope or the
+    request found in the locals of the frame or of its callers.
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if scope is None:
+            scope = getattr(frame.f_locals.get("request"), "scope", None)
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return route_template(scope)
+        frame = frame.f_back
+    return "unknown"
+
+
+class BlockingCallDetector:
+    """
+    Detect the callbacks blocking the event loop longer than `threshold` seconds: a thread pings
+    the event loop and, when the ping isn't answered in time, captures the stack of the event loop
+    thread, then logs it with the route of the request once the event loop is free again.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Watch the running event loop from a thread."""
+        loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(loop, threading.get_ident()),
+            name="event-loop-watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int) -> None:
+        answered = threading.Event()
+        # a ping every half threshold catches the blocks starting between two pings
+        while not self._stop.wait(self.threshold / 2):
+            answered.clear()
+            start = time.perf_counter()
+            try:
+                loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # the event loop is closed
+                return
+            if answered.wait(self.threshold):
+                continue
+
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            frame = frames.get(loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            route = frame_route(frame)
+            del frames, frame
+            while not answered.wait(1):
+                if self._stop.is_set():
+                    return
+            EVENT_LOOP_BLOCKS.labels(route).inc()
+            logger.warning(
+                "Event loop blocked for at least %.3fs on %s, by:\n%s",
+                time.perf_counter() - start,
+                route,
+                stack,
+            )
+
+    async def close(self) -> None:
+        """Stop watching the event loop."""
+        self._stop.set()
+        if self._thread:
+            await asyncio.to_thread(self._thread.join)
+
+
+class EventLoopLagProbe:
+    """
+    Measure how late the event loop wakes up a task sleeping `interval` seconds, and with a
+    `block_threshold`, detect the callbacks blocking the event loop longer than it.
+    """
+
+    def __init__(
+        self, interval: float = LAG_PROBE_INTERVAL, block_threshold: Optional[float] = None
+    ):
+        self.interval = interval
+        self.lags: Deque[float] = deque(maxlen=LAG_PROBE_WINDOW)
+        self.detector = BlockingCallDetector(block_threshold) if block_threshold else None
+        self._task: Optional[asyncio.Task] = None
+
+    def observe(self, lag: float) -> None:
+        """Record the lag of a probe, and update the percentiles of the last probes."""
+        EVENT_LOOP_LAG.observe(lag)
+        self.lags.append(lag)
+        lags = sorted(self.lags)
+        for quantile in LAG_QUANTILES:
+            EVENT_LOOP_LAG_QUANTILES.labels(str(quantile)).set(
+                lags[int(quantile * (len(lags) - 1))]
+            )
+
+    def start(self) -> None:
+        """Probe the event loop periodically."""
+
+        async def _probe() -> None:
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                self.observe(max(time.perf_counter() - start - self.interval, 0.0))
+
+        self._task = asyncio.create_task(_probe())
+        if self.detector:
+            self.detector.start()
+
+    async def close(self) -> None:
+        """Stop probing the event loop."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self.detector:
+            await self.detector.close()
+
+
+class StatisticsCollector(Collector):
+    """
+    Export statistics of the instance, as returned by the `/_mgmt` endpoints, on each scrape.
+    Each source returns either numbers by field, or numbers by field for each value of a label.
+    The fields in `counters` grow monotonically and are exported as counters, the others as
+    gauges.
+    """
+
+    counters: FrozenSet[str] = frozenset()
+
+    def __init__(self) -> None:
+        self._sources: List[Tuple[str, Optional[str], Callable[[], Dict[str, Any]]]] = []
+
+    def add(self, namespace: str, label: Optional[str], fn: Callable[[], Dict[str, Any]]) -> None:
+        """Export the statistics returned by `fn` as `{namespace}_{field}` metrics."""
+        self._sources.append((namespace, label, fn))
+
+    def collect(self) -> Iterator[Metric]:
+        for namespace, label, fn in self._sources:
+            try:
+                stats = fn()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # e.g. the database pools are not created yet
+                logger.debug("Metrics of %s: %s", namespace, e)
+                continue
+
+            families: Dict[str, Union[CounterMetricFamily, GaugeMetricFamily]] = {}
+            for value, fields in stats.items() if label else [("", stats)]:
+                for field, number in fields.items():
+                    if field not in families:
+                        metric_type = (
+                            CounterMetricFamily if field in self.counters else GaugeMetricFamily
+                        )
+                        families[field] = metric_type(
+                            f"{namespace}_{field}",
+                            f"{field.replace('_', ' ').capitalize()}.",
+                            labels=[label] if label else [],
+                        )
+                    families[field].add_metric([value] if label else [], number)
+            yield from families.values()
@@ -9,12 +9,13 @@ import jinja2
 import pystac
 from eoapi.auth_utils import OpenIdConnectAuth, OpenIdConnectSettings
 from fastapi import Depends, FastAPI, Query
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from psycopg import OperationalError
 from psycopg.rows import dict_row
 from psycopg_pool import PoolTimeout
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, Response
 from starlette.templating import Jinja2Templates
 from starlette_cramjam.middleware import CompressionMiddleware
 from titiler.core.errors import DEFAULT_STATUS_CODES, add_exception_handlers
@@ -37,12 +38,16 @@ from titiler.pgstac.factory import (
     add_search_register_route,
 )
 from titiler.pgstac.reader import PgSTACReader
+from titiler.pgstac.settings import PostgresSettings
 
 from . import __version__ as eoapi_raster_version
 from .config import ApiSettings
 from .logs import init_logging
+from .metrics import EventLoopLagProbe, MetricsMiddleware, StatisticsCollector
+from .pool import AdaptivePoolSizer, pool_statistics
 
 settings = ApiSettings()
+postgres_settings = PostgresSettings()
 auth_settings = OpenIdConnectSettings()
 
 
@@ -82,11 +87,28 @@ templates = Jinja2Templates(env=jinja2_env)
 async def lifespan(app: FastAPI):
     """FastAPI Lifespan."""
     logger.debug("Connecting to db...")
-    await connect_to_db(app)
+    await connect_to_db(app, settings=postgres_settings)
     logger.debug("Connected to db.")
 
+    app.state.event_loop_lag_probe = EventLoopLagProbe(
+        block_threshold=settings.event_loop_block_threshold
+    )
+    app.state.event_loop_lag_probe.start()
+
+    if settings.db_adaptive_pool:
+        app.state.pool_sizer = AdaptivePoolSizer(
+            app.state.dbpool,
+            min_size=postgres_settings.db_min_conn_size,
+            max_size=postgres_settings.db_max_conn_size,
+            interval=settings.db_adaptive_pool_interval,
+        )
+        await app.state.pool_sizer.start()
+
     yield
 
+    if pool_sizer := getattr(app.state, "pool_sizer", None):
+        await pool_sizer.close()
+    await app.state.event_loop_lag_probe.close()
     logger.debug("Closing db connections...")
     await close_db_connection(app)
     logger.debug("Closed db connection.")
@@ -119,7 +141,7 @@ if settings.cors_origins:
 app.add_middleware(
     CacheControlMiddleware,
     cachecontrol=settings.cachecontrol,
-    exclude_path={r"/healthz", r"/collections"},
+    exclude_path={r"/healthz", r"/collections", r"/_mgmt", r"/metrics"},
 )
 app.add_middleware(
     CompressionMiddleware,
@@ -131,6 +153,7 @@ app.add_middleware(
         "image/webp",
     },
 )
+app.add_middleware(MetricsMiddleware)
 
 
 ###############################################################################
@@ -145,6 +168,25 @@ async def list_collection(request: Request):
             return r.get("all_collections", [])
 
 
+@app.get("/_mgmt/pool", include_in_schema=False)
+def pool_stats(request: Request):
+    """Connections and connection requests of the database pool of the instance."""
+    return pool_statistics(request.app.state.dbpool)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus metrics of the instance."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+statistics_collector = StatisticsCollector()
+statistics_collector.add(
+    "raster_db_pool", None, lambda: pool_statistics(app.state.dbpool)
+)
+REGISTRY.register(statistics_collector)
+
+
 ###############################################################################
 # STAC Search Endpoints
 searches = MosaicTilerFactory(
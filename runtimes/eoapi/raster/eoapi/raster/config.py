@@ -1,5 +1,9 @@
 """API settings."""
 
+from __future__ import annotations
+
+from typing import Optional
+
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
@@ -14,6 +18,14 @@ class ApiSettings(BaseSettings):
     debug: bool = False
     root_path: str = ""
 
+    # resize the database pool between DB_MIN_CONN_SIZE and DB_MAX_CONN_SIZE
+    db_adaptive_pool: bool = False
+    db_adaptive_pool_interval: float = 10
+
+    # log the stack and the route of the callbacks blocking the event loop longer
+    # than this duration in seconds
+    event_loop_block_threshold: Optional[float] = None
+
     model_config = {
         "env_prefix": "EOAPI_RASTER_",
         "env_file": ".env",
@@ -0,0 +1,33 @@
+"""
+Prometheus metrics of the raster API, see `eoapi.metrics.prometheus`, with the tile render time
+by route template and the statistics of the database pool of the instance.
+"""
+
+import time
+
+from eoapi.metrics.prometheus import EventLoopLagProbe
+from eoapi.metrics.prometheus import MetricsMiddleware as BaseMetricsMiddleware
+from eoapi.metrics.prometheus import StatisticsCollector as BaseStatisticsCollector
+from prometheus_client import Histogram
+
+__all__ = ["EventLoopLagProbe", "MetricsMiddleware", "StatisticsCollector"]
+
+TILE_DURATION = Histogram(
+    "tile_render_duration_seconds",
+    "Duration of the tile requests.",
+    ["route"],
+)
+
+
+class MetricsMiddleware(BaseMetricsMiddleware):
+    def observe(
+        self, route: str, method: str, status: int, size: int, start: float
+    ) -> None:
+        super().observe(route, method, status, size, start)
+        if "{z}" in route and status == 200:
+            TILE_DURATION.labels(route).observe(time.perf_counter() - start)
+
+
+class StatisticsCollector(BaseStatisticsCollector):
+    # statistics growing monotonically, exported as counters
+    counters = frozenset({"requests", "queued", "errors"})
@@ -0,0 +1,90 @@
+"""Database connection pool statistics and adaptive sizing."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+def pool_statistics(pool: ConnectionPool) -> Dict[str, Any]:
+    """Connections and connection requests of the pool."""
+    # psycopg_pool leaves out the counters still at zero
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    return {
+        "size": stats["pool_size"],
+        "min_size": stats["pool_min"],
+        "max_size": stats["pool_max"],
+        "in_use": stats["pool_size"] - stats["pool_available"],
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "queued": stats.get("requests_queued", 0),
+        "errors": stats.get("requests_errors", 0),
+        "mean_wait_seconds": round(
+            stats.get("requests_wait_ms", 0) / 1000 / max(requests, 1), 6
+        ),
+    }
+
+
+class AdaptivePoolSizer:
+    """
+    Resize the pool between `min_size` and `max_size` connections every `interval`
+    seconds: double it when requests waited for a connection, shrink it by one
+    connection when connections were left idle.
+    """
+
+    def __init__(
+        self, pool: ConnectionPool, min_size: int, max_size: int, interval: float
+    ):
+        self.pool = pool
+        self.min_size = min_size
+        self.max_size = max_size
+        self.interval = interval
+        self._queued = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def adjust(self) -> None:
+        """Resize the pool from the requests of the last interval."""
+        stats = self.pool.get_stats()
+        size = stats["pool_max"]
+        queued = stats.get("requests_queued", 0)
+        if queued > self._queued or stats.get("requests_waiting", 0):
+            new_size = min(size * 2, self.max_size)
+        elif stats["pool_available"] > 0:
+            new_size = max(size - 1, self.min_size)
+        else:
+            new_size = size
+        self._queued = queued
+
+        if new_size != size:
+            await self._resize(new_size)
+
+    async def _resize(self, size: int) -> None:
+        # the pool closes the connections in excess, blocking, outside of the event loop
+        await asyncio.to_thread(self.pool.resize, size, size)
+
+    async def start(self) -> None:
+        """Start from the minimum size and resize the pool periodically."""
+        await self._resize(self.min_size)
+
+        async def _adjust() -> None:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.adjust()
+                except (psycopg.Error, ValueError) as e:
+                    logger.error("Pool resize: %s", e)
+
+        self._task = asyncio.create_task(_adjust())
+
+    async def close(self) -> None:
+        """Stop resizing the pool."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -0,0 +1,131 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark the links generation of `/collections` responses, with the memoized links against the
+former loop over `CollectionLinks`.
+
+    python benchmarks/collection_links.py --collections 5000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import copy
+import time
+from typing import Any, Callable, Coroutine, Dict, List
+from urllib.parse import urljoin
+
+from fastapi import FastAPI
+from stac_fastapi.pgstac.models.links import CollectionLinks
+from stac_fastapi.types.core import Relations
+from stac_fastapi.types.requests import get_base_url
+from stac_fastapi.types.stac import Collection
+from stac_pydantic.shared import MimeTypes
+from starlette.requests import Request
+
+from eoapi.stac.links import collection_links
+
+
+def make_request() -> Request:
+    app = FastAPI()
+    app.state.router_prefix = "/stac"
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "https",
+            "server": ("catalog.example.com", 443),
+            "root_path": "",
+            "path": "/stac/collections",
+            "query_string": b"",
+            "headers": [],
+            "app": app,
+        }
+    )
+
+
+def make_collections(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"collection-{i}",
+            "type": "Collection",
+            "links": [
+                {"rel": "license", "href": "https://example.com/license"},
+                {"rel": "about", "href": "docs/about.html"},
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+async def loop_links(collections: List[Dict[str, Any]], request: Request) -> None:
+    base_url = get_base_url(request)
+    for c in collections:
+        coll = Collection(**c)
+        coll["links"] = await CollectionLinks(
+            collection_id=coll["id"],
+            request=request,
+        ).get_links(extra_links=coll.get("links"))
+        url = urljoin(base_url, "collections/" + coll["id"] + "/queryables")
+        coll["links"].append(
+            {
+                "rel": Relations.queryables.value,
+                "type": MimeTypes.jsonschema.value,
+                "title": "Queryables",
+                "href": url,
+            }
+        )
+
+
+async def memoized_links(collections: List[Dict[str, Any]], request: Request) -> None:
+    base_url = get_base_url(request)
+    for c in collections:
+        c["links"] = collection_links(base_url, c["id"], c.get("links"), queryables=True)
+
+
+async def bench(
+    fn: Callable[[List[Dict[str, Any]], Request], Coroutine[Any, Any, None]],
+    collections: List[Dict[str, Any]],
+    rounds: int,
+) -> float:
+    request = make_request()
+    durations = []
+    for _ in range(rounds):
+        rows = copy.deepcopy(collections)
+        ts = time.perf_counter()
+        await fn(rows, request)
+        durations.append(time.perf_counter() - ts)
+    return min(durations)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--collections", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    collections = make_collections(args.collections)
+    loop = await bench(loop_links, collections, args.rounds)
+    memoized = await bench(memoized_links, collections, args.rounds)
+
+    print(f"{args.collections} collections, best of {args.rounds} rounds")
+    print(f"  CollectionLinks loop: {loop * 1000:8.1f} ms")
+    print(f"  memoized links:       {memoized * 1000:8.1f} ms ({loop / memoized:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,11 +4,14 @@
 import logging
 import os
 from contextlib import asynccontextmanager
+from typing import Optional
 
 import jinja2
-from fastapi import Depends, FastAPI
+from eoapi.auth_utils import OpenIdConnectAuth
+from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.responses import ORJSONResponse
 from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from stac_fastapi.api.app import StacApi
 from stac_fastapi.api.middleware import ProxyHeaderMiddleware
 from stac_fastapi.api.models import (
@@ -36,19 +39,17 @@ from stac_fastapi.extensions.core.free_text import FreeTextConformanceClasses
 from stac_fastapi.extensions.core.query import QueryConformanceClasses
 from stac_fastapi.extensions.core.sort import SortConformanceClasses
 from stac_fastapi.extensions.third_party import BulkTransactionExtension
-from stac_fastapi.pgstac.db import close_db_connection, connect_to_db
+from stac_fastapi.pgstac.db import DB, close_db_connection, connect_to_db
 from stac_fastapi.pgstac.extensions import QueryExtension
-from stac_fastapi.pgstac.transactions import BulkTransactionsClient
 from stac_fastapi.pgstac.types.search import PgstacSearch
 from stac_fastapi.types.extension import ApiExtension
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, Response
 from starlette.templating import Jinja2Templates
 from starlette_cramjam.middleware import CompressionMiddleware
 
-from eoapi.auth_utils import OpenIdConnectAuth
 from eoapi.stac.auth import (
     CollectionsScopes,
     EoApiOpenIdConnectSettings,
@@ -57,13 +58,29 @@ from eoapi.stac.auth import (
 )
 from eoapi.stac.config import Settings
 from eoapi.stac.core import EOCClient
+from eoapi.stac.cost import SearchCostGuard
+from eoapi.stac.db import Reader, ReaderPools, get_connection, pool_statistics
+from eoapi.stac.extensions.batch import BatchItemsExtension, BatchSearchExtension
 from eoapi.stac.extensions.collection_search import CollectionSearchIdsExtension
 from eoapi.stac.extensions.filter import FiltersClient
 from eoapi.stac.extensions.titiller import TiTilerExtension
-from eoapi.stac.extensions.transaction import EoApiTransactionsClient
+from eoapi.stac.extensions.transaction import (
+    EoApiBulkTransactionsClient,
+    EoApiTransactionsClient,
+)
+from eoapi.stac.free_text import has_collections_fts_index
 from eoapi.stac.logs import init_logging
+from eoapi.stac.metrics import EventLoopLagProbe, MetricsMiddleware, StatisticsCollector
+from eoapi.stac.middlewares.conditional import ConditionalRequestMiddleware
+from eoapi.stac.middlewares.rate_limit import RateLimitMiddleware, rate_limit_stats
+from eoapi.stac.middlewares.server_timing import ServerTimingMiddleware, TimedORJSONResponse
 from eoapi.stac.middlewares.timeout import add_timeout
+from eoapi.stac.prefetch import SearchPrefetcher
+from eoapi.stac.preload import SearchPreloader
+from eoapi.stac.queryables import QueryablesStore
+from eoapi.stac.stats import TOP_KEYS_CAPACITY, cache_stats
 from eoapi.stac.utils import fetch_all_collections_with_scopes
+from eoapi.stac.warmup import CacheWarmer
 
 PACKAGE_NAME = __package__ or "eoapi.stac"
 
@@ -83,9 +100,9 @@ application_extensions_map: dict[str, ApiExtension] = {
     "transaction": TransactionExtension(
         client=EoApiTransactionsClient(),
         settings=settings,
-        response_class=ORJSONResponse,
+        response_class=TimedORJSONResponse,
     ),
-    "bulk_transactions": BulkTransactionExtension(client=BulkTransactionsClient()),
+    "bulk_transactions": BulkTransactionExtension(client=EoApiBulkTransactionsClient()),
 }
 
 search_extensions_map: dict[str, ApiExtension] = {
@@ -104,7 +121,11 @@ cs_extensions_map: dict[str, ApiExtension] = {
     "free_text": FreeTextExtension(
         conformance_classes=[FreeTextConformanceClasses.COLLECTIONS],
     ),
-    "pagination": OffsetPaginationExtension(),
+    "pagination": (
+        TokenPaginationExtension()
+        if settings.collections_token_pagination
+        else OffsetPaginationExtension()
+    ),
     "ids": CollectionSearchIdsExtension(),
 }
 
@@ -126,6 +147,8 @@ known_extensions = {
     *cs_extensions_map.keys(),
     *itm_col_extensions_map.keys(),
     "collection_search",
+    "batch_search",
+    "batch_items",
 }
 
 enabled_extensions = (
@@ -153,6 +176,24 @@ post_request_model = create_post_request_model(
 get_request_model = create_get_request_model(search_extensions)
 application_extensions.extend(search_extensions)
 
+client = EOCClient(pgstac_search_model=post_request_model)  # type: ignore
+
+# /search/batch
+if "batch_search" in enabled_extensions:
+    application_extensions.append(
+        BatchSearchExtension(
+            client=client,
+            search_post_request_model=post_request_model,
+            max_searches=settings.batch_search_max_searches,
+        )
+    )
+
+# /items/batch
+if "batch_items" in enabled_extensions:
+    application_extensions.append(
+        BatchItemsExtension(client=client, max_items=settings.batch_items_max_items)
+    )
+
 # /collections/{collectionId}/items model
 items_get_request_model = ItemCollectionUri  # pylint: disable=invalid-name
 itm_col_extensions = [
@@ -178,27 +219,133 @@ if "collection_search" in enabled_extensions:
     application_extensions.append(collection_search_extension)
 
 
+async def connect_to_readers(app: FastAPI) -> None:  # pylint: disable=redefined-outer-name
+    """Create the pools of the additional readers and balance reads between the readers."""
+    readers = [Reader("reader", app.state.readpool)]
+    for host in settings.postgres_extra_hosts_reader:
+        pool = await DB().create_pool(settings.connection_string(host), settings)
+        readers.append(Reader(host, pool))
+    app.state.reader_pools = ReaderPools(
+        readers,
+        max_lag=settings.reader_max_lag,
+        read_after_write_window=settings.read_after_write_window,
+    )
+    app.state.reader_pools.start(settings.reader_lag_interval)
+    logger.info("Balance reads between %d readers", len(readers))
+
+
+async def connect_to_cache(app: FastAPI) -> None:  # pylint: disable=redefined-outer-name
+    """Connect to redis and start the search prefetch and preload."""
+    from eoapi.stac.redis import connect_to_redis  # pylint: disable=import-outside-toplevel
+
+    await connect_to_redis(app)
+
+    if settings.search_prefetch_collections:
+        app.state.search_prefetcher = SearchPrefetcher(settings.search_prefetch_concurrency)
+
+    if settings.search_preload_top:
+        app.state.search_preloader = SearchPreloader(
+            top=settings.search_preload_top,
+            capacity=settings.search_preload_capacity,
+            interval=settings.search_preload_interval,
+            decay_interval=settings.redis_ttl,
+        )
+        app.state.search_preloader.start(app)
+
+
+# background tasks of the application, stopped in this order at shutdown
+BACKGROUND_TASKS = [
+    "cache_warmer",
+    "search_prefetcher",
+    "search_preloader",
+    "queryables",
+    "reader_pools",
+    "event_loop_lag_probe",
+]
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # pylint: disable=redefined-outer-name
     """FastAPI Lifespan."""
-    await connect_to_db(app)
+    await connect_to_db(app, get_conn=get_connection)
+
+    app.state.event_loop_lag_probe = EventLoopLagProbe(
+        block_threshold=settings.event_loop_block_threshold
+    )
+    app.state.event_loop_lag_probe.start()
+
+    request = Request({"type": "http", "app": app})
+    async with app.state.get_connection(request, "r") as conn:
+        app.state.collections_fts = await has_collections_fts_index(conn)
+    if app.state.collections_fts:
+        logger.info("Use the full-text index of collections for free-text collection searches")
+
+    if settings.postgres_extra_hosts_reader:
+        await connect_to_readers(app)
 
     if settings.redis_enabled:
-        from eoapi.stac.redis import connect_to_redis  # pylint: disable=import-outside-toplevel
+        await connect_to_cache(app)
 
-        await connect_to_redis(app)
+    if settings.precomputed_queryables:
+        app.state.queryables = QueryablesStore(
+            settings.queryables_refresh_interval, settings.queryables_max_age
+        )
+        await app.state.queryables.refresh(app)
+        app.state.queryables.start(app)
 
     # add restrictions to endpoints
     if auth_settings.openid_configuration_url:
         logger.info("Add access restrictions to transaction endpoints")
         await lock_transaction_endpoints()
+
+    if settings.redis_enabled and settings.cache_warmup:
+        app.state.cache_warmer = CacheWarmer(
+            app,
+            base_url=settings.cache_warmup_base_url,
+            searches=settings.cache_warmup_searches,  # type: ignore[arg-type]
+            concurrency=settings.cache_warmup_concurrency,
+        )
+        app.state.cache_warmer.schedule()
     yield
 
+    for name in BACKGROUND_TASKS:
+        if task := getattr(app.state, name, None):
+            await task.close()
     await close_db_connection(app)
 
 
 # Middlewares
+# StacApi stacks the middlewares in reverse: the last one gets the requests first.
+# Innermost, the conditional requests validate the uncompressed body, with the host of the proxy
+# headers, and their 304 responses get the CORS headers.
 middlewares = [
+    Middleware(
+        ConditionalRequestMiddleware,
+        cachecontrol={
+            "landing": settings.cachecontrol,
+            "queryables": settings.cachecontrol,
+            "collections": settings.cachecontrol_collections,
+            "items": settings.cachecontrol_items,
+        },
+        key_prefix=settings.stac_fastapi_landing_id,
+        ttl=settings.redis_ttl,
+    )
+]
+
+# inside CORS, so that rate limited requests get the CORS headers
+if settings.rate_limit or settings.max_requests_in_flight is not None:
+    middlewares.append(
+        Middleware(
+            RateLimitMiddleware,
+            rate=settings.rate_limit,
+            burst=settings.rate_limit_burst,
+            max_in_flight=settings.max_requests_in_flight,
+            key_prefix=settings.stac_fastapi_landing_id,
+            oidc_auth=EOCClient.oidc_auth,
+        )
+    )
+
+middlewares += [
     Middleware(CompressionMiddleware),
     Middleware(ProxyHeaderMiddleware),
     Middleware(
@@ -208,11 +355,18 @@ middlewares = [
     ),
 ]
 
+# outside the conditional requests, so that validated responses get their timing too
+if settings.server_timing:
+    middlewares.append(Middleware(ServerTimingMiddleware))
+
 if settings.otel_enabled:
     from eoapi.stac.middlewares.tracing import TraceMiddleware
 
     middlewares.append(Middleware(TraceMiddleware, service_name=settings.otel_service_name))
 
+# outermost, so that the metrics cover the responses of all the others (not modified, rate limited)
+middlewares.append(Middleware(MetricsMiddleware))
+
 api = StacApi(
     app=update_openapi(
         FastAPI(
@@ -233,8 +387,8 @@ api = StacApi(
     ),
     settings=settings,
     extensions=application_extensions,
-    client=EOCClient(pgstac_search_model=post_request_model),  # type: ignore
-    response_class=ORJSONResponse,
+    client=client,
+    response_class=TimedORJSONResponse,
     items_get_request_model=items_get_request_model,  # type: ignore[reportArgumentType]
     search_get_request_model=get_request_model,  # type: ignore[reportArgumentType]
     search_post_request_model=post_request_model,  # type: ignore[reportArgumentType]
@@ -259,6 +413,74 @@ async def viewer_page(request: Request):
     )
 
 
+if (
+    settings.search_max_cost is not None
+    or settings.search_expensive_cost is not None
+    or settings.search_max_intersects_points is not None
+):
+    app.state.search_cost_guard = SearchCostGuard(
+        max_cost=settings.search_max_cost,
+        expensive_cost=settings.search_expensive_cost,
+        expensive_concurrency=settings.search_expensive_concurrency,
+        max_points=settings.search_max_intersects_points,
+    )
+
+
+@app.get("/_mgmt/ready", include_in_schema=False)
+async def readiness(request: Request):
+    """Whether the instance is ready to serve requests, i.e. its cache was warmed up."""
+    cache_warmer: Optional[CacheWarmer] = getattr(request.app.state, "cache_warmer", None)
+    if cache_warmer and not cache_warmer.ready:
+        return ORJSONResponse({"ready": False}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return {"ready": True}
+
+
+def statistics_enabled() -> None:
+    """
+    Hide the statistics of the instance, unless they require the admin scope (with OIDC) or are
+    made public.
+    """
+    if not auth_settings.openid_configuration_url and not settings.mgmt_statistics:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@app.get("/_mgmt/cache", include_in_schema=False, dependencies=[Depends(statistics_enabled)])
+async def cache_statistics():
+    """Cache hits, misses, hit ratio, latencies and payload size of the instance by prefix."""
+    return cache_stats.as_dict()
+
+
+@app.get("/_mgmt/cache/keys", include_in_schema=False, dependencies=[Depends(statistics_enabled)])
+async def cache_top_keys(limit: int = Query(20, ge=1, le=TOP_KEYS_CAPACITY)):
+    """Most looked up cache keys of the instance."""
+    return cache_stats.top_keys(limit)
+
+
+@app.get("/_mgmt/rate-limit", include_in_schema=False, dependencies=[Depends(statistics_enabled)])
+async def rate_limit_statistics():
+    """Requests allowed, rate limited and shed by the instance."""
+    return rate_limit_stats.as_dict()
+
+
+@app.get("/_mgmt/pool", include_in_schema=False, dependencies=[Depends(statistics_enabled)])
+async def database_pool_statistics(request: Request):
+    """Connections and connection acquisitions of the database pools of the instance."""
+    return pool_statistics(request.app)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics of the instance."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+statistics_collector = StatisticsCollector()
+statistics_collector.add("stac_cache", "prefix", cache_stats.as_dict)
+statistics_collector.add("stac_db_pool", "pool", lambda: pool_statistics(app))
+statistics_collector.add("stac_rate_limit", None, rate_limit_stats.as_dict)
+REGISTRY.register(statistics_collector)
+
+
 async def lock_transaction_endpoints():
     """Lock transaction endpoints."""
     # get scopes for collections
@@ -276,6 +498,12 @@ async def lock_transaction_endpoints():
         ("POST", admin_scope, "/collections/{collection_id}/items"),
         ("PUT", admin_scope, "/collections/{collection_id}/items/{item_id}"),
         ("DELETE", admin_scope, "/collections/{collection_id}/items/{item_id}"),
+        # the statistics of the instance, the keys hold the ids of the restricted collections
+        # and items
+        ("GET", admin_scope, "/_mgmt/cache"),
+        ("GET", admin_scope, "/_mgmt/cache/keys"),
+        ("GET", admin_scope, "/_mgmt/rate-limit"),
+        ("GET", admin_scope, "/_mgmt/pool"),
     ]
     api_routes = {}
     for route in app.routes:
@@ -17,7 +17,7 @@
 # limitations under the License.
 """eocatalog.stac.auth."""
 
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
 import jwt
 from fastapi import HTTPException
@@ -28,6 +28,8 @@ from starlette import status
 from starlette.requests import Request
 
 from eoapi.auth_utils import OpenIdConnectAuth
+from eoapi.stac.middlewares.server_timing import timed
+from eoapi.stac.middlewares.tracing import child_span
 
 
 class EoApiOpenIdConnectSettings(BaseSettings):
@@ -92,39 +94,66 @@ def oidc_auth_from_settings(
     return None
 
 
-def get_user_scopes_from_request(request: Request, oidc_auth: OpenIdConnectAuth) -> List[str]:
+def get_token_payload(request: Request, oidc_auth: OpenIdConnectAuth) -> Optional[Dict[str, Any]]:
     """
-    retrieves the scopes of the user based on the given request
+    verifies the token of the given request and returns its payload
     Args:
-        request: the scopes will be retrieved from the token in the headers of the starlette request
+        request: the token will be retrieved from the headers of the starlette request
         oidc_auth: authentication object from which the signing key and the allowed audiences are
             retrieved
 
     Returns:
-        List of the user scopes
+        payload of the token, None if the request has no token
 
     Raises:
         HTTPException if the token cannot be decoded or is invalid
     """
     if "Authorization" not in request.headers:
-        return []
+        return None
+    # the token is verified once per request, the rate limiting and the sub-requests (e.g. batch
+    # search) share the state
+    payload: Optional[Dict[str, Any]] = getattr(request.state, "token_payload", None)
+    if payload is not None:
+        return payload
     token = request.headers["Authorization"].replace("Bearer ", "")
     try:
-        key = oidc_auth.jwks_client.get_signing_key_from_jwt(token).key
-        payload = jwt.decode(
-            token,
-            key,
-            algorithms=["RS256"],
-            # NOTE: Audience validation MUST match audience claim if set in token
-            # (https://pyjwt.readthedocs.io/en/stable/changelog.html?highlight=audience#id40)
-            audience=oidc_auth.allowed_jwt_audiences,
-        )
+        with timed("auth"), child_span("auth.verify_token"):
+            key = oidc_auth.jwks_client.get_signing_key_from_jwt(token).key
+            payload = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                # NOTE: Audience validation MUST match audience claim if set in token
+                # (https://pyjwt.readthedocs.io/en/stable/changelog.html?highlight=audience#id40)
+                audience=oidc_auth.allowed_jwt_audiences,
+            )
     except (jwt.exceptions.InvalidTokenError, jwt.exceptions.DecodeError) as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
+    request.state.token_payload = payload
+    return payload
+
+
+def get_user_scopes_from_request(request: Request, oidc_auth: OpenIdConnectAuth) -> List[str]:
+    """
+    retrieves the scopes of the user based on the given request
+    Args:
+        request: the scopes will be retrieved from the token in the headers of the starlette request
+        oidc_auth: authentication object from which the signing key and the allowed audiences are
+            retrieved
+
+    Returns:
+        List of the user scopes
+
+    Raises:
+        HTTPException if the token cannot be decoded or is invalid
+    """
+    payload = get_token_payload(request, oidc_auth)
+    if payload is None:
+        return []
     return payload["scope"].split()
 
 
@@ -1,7 +1,9 @@
 # Copyright 2024, CS GROUP - France, https://www.csgroup.eu/
 """API settings."""
 
+import json
 from typing import Optional
+from urllib.parse import quote
 
 from pydantic import Field, computed_field, field_validator
 from stac_fastapi.pgstac.config import Settings as BaseSettings
@@ -12,13 +14,102 @@ from eoapi.stac.constants import DEFAULT_TTL
 class Settings(BaseSettings):
     """API settings"""
 
-    cachecontrol: str = "public, max-age=3600"
+    cachecontrol: str = Field(
+        default="public, max-age=3600",
+        description="Cache-Control header of the landing page and queryables responses.",
+    )
+    cachecontrol_collections: str = Field(
+        default="public, no-cache",
+        description="Cache-Control header of the collections responses.",
+    )
+    cachecontrol_items: str = Field(
+        default="public, no-cache", description="Cache-Control header of the item responses."
+    )
     debug: bool = False
 
     titiler_endpoint: Optional[str] = None
 
     request_timeout: int = Field(default=30, description="Timeout pending requests.")
 
+    batch_search_max_searches: int = Field(
+        default=20, description="Maximum number of searches in a batch search request."
+    )
+    batch_search_concurrency: int = Field(
+        default=4, description="Maximum number of batched searches querying the database at once."
+    )
+    batch_items_max_items: int = Field(
+        default=250,
+        ge=1,
+        # the missing items are fetched with a single search, within the pgstac maximum limit
+        le=10000,
+        description="Maximum number of items in a batch items request.",
+    )
+    rate_limit: Optional[float] = Field(
+        default=None,
+        description="Maximum number of requests per second of each request entity.",
+    )
+    rate_limit_burst: int = Field(
+        default=20, description="Number of requests a request entity may send at once."
+    )
+    max_requests_in_flight: Optional[int] = Field(
+        default=None,
+        description="Shed requests once this many are processed while the database pool is "
+        "saturated.",
+    )
+    search_max_cost: Optional[float] = Field(
+        default=None,
+        description="Reject item searches whose cost estimated by the query planner is higher.",
+    )
+    search_expensive_cost: Optional[float] = Field(
+        default=None,
+        description="Queue item searches whose cost estimated by the query planner is higher.",
+    )
+    search_expensive_concurrency: int = Field(
+        default=2, description="Maximum number of expensive item searches running at once."
+    )
+    search_max_intersects_points: Optional[int] = Field(
+        default=None,
+        description="Reject item searches intersecting geometries with more points.",
+    )
+    collections_token_pagination: bool = Field(
+        default=False,
+        description="Paginate collection searches with tokens instead of offsets.",
+    )
+    collections_free_text_ranking: bool = Field(
+        default=False,
+        description="Sort the results of free-text collection searches by relevance, if not "
+        "sorted otherwise. Requires the full-text index of collections.",
+    )
+    precomputed_queryables: bool = Field(
+        default=False,
+        description="Keep the queryables of all the collections in memory, computed again only "
+        "when the collections or the queryables change.",
+    )
+    queryables_refresh_interval: float = Field(
+        default=10, description="Interval in seconds between checks for queryables changes."
+    )
+    queryables_max_age: float = Field(
+        default=300,
+        description="Age in seconds after which the queryables are computed again, changes of "
+        "the collections or the queryables being detected with a delay.",
+    )
+
+    postgres_extra_hosts_reader: str = Field(
+        default="",
+        description="Comma separated hostnames of additional read-only services.",
+    )
+    reader_max_lag: float = Field(
+        default=30, description="Replication lag in seconds above which a reader is avoided."
+    )
+    reader_lag_interval: float = Field(
+        default=5, description="Interval in seconds between measures of the readers lag."
+    )
+    read_after_write_window: float = Field(
+        default=10,
+        description="Seconds after a write of a request entity during which its reads go to "
+        "readers which caught up with the write, or to the writer.",
+    )
+
     redis_cluster: bool = False
     redis_ttl: int = Field(default=DEFAULT_TTL)
     redis_hostname: Optional[str] = None
@@ -26,13 +117,74 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_ssl: bool = True
 
+    search_bbox_precision: Optional[int] = Field(
+        default=None,
+        description="Opt-in: run item searches over their bbox rounded outward to this number of "
+        "decimals to share cache entries, the features out of the bbox being dropped. Pages may "
+        "then hold less features than the limit and have no matched count.",
+    )
+
+    search_prefetch_collections: str = Field(
+        default="",
+        description="Comma separated collections whose searches get their next page prefetched, "
+        "'*' for all. Requires redis.",
+    )
+    search_prefetch_concurrency: int = Field(
+        default=4, description="Maximum number of pages prefetched at once."
+    )
+
+    search_preload_top: int = Field(
+        default=0,
+        description="Number of most frequent searches whose cache entries are refreshed before "
+        "they expire. Requires redis.",
+    )
+    search_preload_capacity: int = Field(
+        default=1000, description="Number of distinct searches counted for the preload."
+    )
+    search_preload_interval: int = Field(
+        default=30, description="Interval in seconds between two refreshes of the top searches."
+    )
+
+    cache_warmup: bool = Field(
+        default=False,
+        description="Fill the cache at startup and after changes of the collections. "
+        "Requires redis.",
+    )
+    cache_warmup_base_url: str = Field(
+        default="http://localhost",
+        description="Public base URL of the API, used in the links of the warmed up responses.",
+    )
+    cache_warmup_searches: str = Field(
+        default="",
+        description="JSON list of item search bodies to warm up.",
+    )
+    cache_warmup_concurrency: int = Field(
+        default=4, description="Maximum number of resources warmed up at once."
+    )
+
     stac_fastapi_landing_id: str = "eo-catalog-stac"
 
     eoapi_auth_metadata_field: str = "scope"
     eoapi_auth_update_scope: str = "admin"
+    mgmt_statistics: bool = Field(
+        default=False,
+        description="Expose the statistics of the instance on /_mgmt without authentication "
+        "when OIDC is not configured. With OIDC, they require the update scope.",
+    )
 
     otel_enabled: bool = False
     otel_service_name: str = "eo-catalog-stac"
+    event_loop_block_threshold: Optional[float] = Field(
+        default=None,
+        description=(
+            "Log the stack and the route of the callbacks blocking the event loop longer than "
+            "this duration in seconds, if set."
+        ),
+    )
+    server_timing: bool = Field(
+        default=False,
+        description="Return the duration of the steps of the requests in a Server-Timing header.",
+    )
 
     @field_validator("cors_origins")
     @classmethod
@@ -46,6 +198,31 @@ class Settings(BaseSettings):
         """Parse CORS methods."""
         return [method.strip() for method in v.split(",")]
 
+    @field_validator("search_prefetch_collections")
+    @classmethod
+    def parse_search_prefetch_collections(cls, v: str):
+        """Parse prefetched collections."""
+        return [collection.strip() for collection in v.split(",") if collection.strip()]
+
+    @field_validator("cache_warmup_searches")
+    @classmethod
+    def parse_cache_warmup_searches(cls, v: str):
+        """Parse warmed up searches."""
+        return json.loads(v) if v.strip() else []
+
+    @field_validator("postgres_extra_hosts_reader")
+    @classmethod
+    def parse_postgres_extra_hosts_reader(cls, v: str):
+        """Parse additional reader hosts."""
+        return [host.strip() for host in v.split(",") if host.strip()]
+
+    def connection_string(self, host: str) -> str:
+        """Connection string to the database on the given host."""
+        return (
+            f"postgresql://{self.postgres_user}:{quote(self.postgres_pass)}"
+            f"@{host}:{self.postgres_port}/{self.postgres_dbname}"
+        )
+
     @computed_field  # type: ignore[misc]
     @property
     def redis_enabled(self) -> bool:
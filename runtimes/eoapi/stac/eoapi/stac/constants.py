@@ -35,6 +35,8 @@ HTTP_429_TOO_MANY_REQUESTS = 429
 HTTP_METHOD = "http.request.method"
 HTTP_URL = "url.full"
 HTTP_PATH = "url.path"
+HTTP_ROUTE = "http.route"
+HTTP_STATUS_CODE = "http.response.status_code"
 
 
 CACHE_KEY_ITEM = "/item"
@@ -46,3 +48,14 @@ CACHE_KEY_COLLECTIONS = "/collections"
 CACHE_KEY_QUERYABLES = "/queryables"
 
 CACHE_KEY_BASE_ITEM = "/base-item"
+
+# keys of the cached searches and item pages by searched collection (`:{collection id}`, no
+# suffix for the searches over all the collections): the indexes referencing their items and the
+# results stored with their features, which are stale as soon as one of their items changes
+CACHE_KEY_SEARCH_INDEXES = "/search-indexes"
+CACHE_KEY_SEARCH_RESULTS = "/search-results"
+
+# validators of the responses for conditional requests, dropped when the generation of their
+# resource (`:{resource type}`, `:items:{collection id}` for the items) changes
+CACHE_KEY_VALIDATOR = "/validator"
+CACHE_KEY_GENERATION = "/generation"
@@ -17,20 +17,21 @@
 # limitations under the License.
 """Core"""
 
+import asyncio
 import json
 import logging
 import time
-from typing import Any, Callable, Coroutine, Dict, List, Optional, TypeVar
-from urllib.parse import unquote_plus, urljoin
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import unquote_plus, urlsplit
 
 import attr
 import orjson
-from buildpg import render
 from fastapi import Depends, Request
+from stac_fastapi.extensions.core.filter.request import FilterExtensionPostRequest
 from stac_fastapi.pgstac.core import CoreCrudClient
-from stac_fastapi.pgstac.models.links import CollectionLinks, CollectionSearchPagingLinks
+from stac_fastapi.pgstac.models.links import CollectionSearchPagingLinks
 from stac_fastapi.pgstac.types.search import PgstacSearch
-from stac_fastapi.types.core import Relations
 from stac_fastapi.types.requests import get_base_url
 from stac_fastapi.types.stac import (
     Collection,
@@ -39,7 +40,7 @@ from stac_fastapi.types.stac import (
     ItemCollection,
     LandingPage,
 )
-from stac_pydantic.shared import BBox, MimeTypes
+from stac_pydantic.shared import BBox
 
 from eoapi.auth_utils import OpenIdConnectAuth
 from eoapi.stac.auth import (
@@ -57,11 +58,68 @@ from eoapi.stac.constants import (
     CACHE_KEY_LANDING,
     CACHE_KEY_SEARCH,
 )
+from eoapi.stac.cost import SearchCostGuard
+from eoapi.stac.free_text import (
+    FILTER_ARGS,
+    free_text_collection_ids,
+    free_text_search,
+    is_ranked,
+)
+from eoapi.stac.links import collection_links
 from eoapi.stac.logs import get_custom_dimensions
+from eoapi.stac.middlewares.server_timing import timed
+from eoapi.stac.middlewares.tracing import add_stac_attributes_from_search, child_span
+from eoapi.stac.normalize import (
+    clip_search_result,
+    normalize_collection_search,
+    normalize_search,
+    quantize_search,
+    search_cache_key,
+)
+from eoapi.stac.pagination import (
+    decode_token,
+    encode_token,
+    keyset_direction,
+    keyset_search,
+)
+from eoapi.stac.prefetch import SearchPrefetcher, next_token
+from eoapi.stac.preload import SearchPreloader
+from eoapi.stac.statements import COLLECTION_SEARCH, COLLECTION_SEARCH_ROWS
+from eoapi.stac.utils import sub_request
+from eoapi.stac.warmup import internal_scope
 
 logger = logging.getLogger(__name__)
 
 
+class ItemsSearch(PgstacSearch, FilterExtensionPostRequest):
+    """Search of items by (collection id, item id) pairs."""
+
+
+def items_search(items: List[Tuple[str, str]]) -> ItemsSearch:
+    """
+    Search matching exactly the given (collection id, item id) pairs. The ids and collections
+    restrict the partitions and the items scanned, the filter keeps only the requested pairs.
+    """
+    return ItemsSearch(
+        ids=list(dict.fromkeys(item_id for _, item_id in items)),
+        collections=list(dict.fromkeys(collection_id for collection_id, _ in items)),
+        filter={
+            "op": "or",
+            "args": [
+                {
+                    "op": "and",
+                    "args": [
+                        {"op": "=", "args": [{"property": "collection"}, collection_id]},
+                        {"op": "=", "args": [{"property": "id"}, item_id]},
+                    ],
+                }
+                for collection_id, item_id in items
+            ],
+        },
+        limit=len(items),
+    )
+
+
 @attr.s
 class EOCClient(CoreCrudClient):
     """Client for core endpoints defined by stac."""
@@ -99,6 +157,7 @@ class EOCClient(CoreCrudClient):
         filter_lang: Optional[str] = None,
         q: Optional[List[str]] = None,
         ids: Optional[List[str]] = None,
+        token: Optional[str] = None,
         **kwargs: Any,
     ) -> Collections:
         """Cross catalog search (GET).
@@ -114,10 +173,14 @@ class EOCClient(CoreCrudClient):
             ids = list(set(collections_with_scopes) & set(ids))
 
         # don't return the scope of the collection
-        fields = fields or []
-        fields.append("-scope")
+        fields = [*(fields or []), "-scope"]
+
+        settings: Settings = request.app.state.settings
 
         clean_args = {}
+        keyset: Optional[str] = None
+        page: Dict[str, Any] = {}
+        ranked = False
         if self.extension_is_enabled("CollectionSearchExtension"):
             if query:
                 query = orjson.loads(unquote_plus(query))  # pylint: disable=no-member
@@ -137,6 +200,20 @@ class EOCClient(CoreCrudClient):
                 filter_lang=filter_lang,
                 q=q,
             )
+            clean_args = normalize_collection_search(clean_args)
+            ranked = is_ranked(clean_args, settings.collections_free_text_ranking) and getattr(
+                request.app.state, "collections_fts", False
+            )
+
+            if settings.collections_token_pagination:
+                page = decode_token(token) if token else {}
+                keyset = None if ranked else keyset_direction(clean_args.get("sortby"))
+                if keyset:
+                    clean_args = keyset_search(
+                        clean_args, keyset, page.get("after"), page.get("before")
+                    )
+                elif page.get("offset"):
+                    clean_args["offset"] = page["offset"]
 
         async def _fetch() -> Collections:
             base_url = get_base_url(request)
@@ -145,22 +222,21 @@ class EOCClient(CoreCrudClient):
             prev_link: Optional[Dict[str, Any]] = None
             result: Collections
 
-            if self.extension_is_enabled("CollectionSearchExtension"):
-                async with request.app.state.get_connection(request, "r") as conn:
-                    q, p = render(
-                        """
-                        SELECT * FROM collection_search(:req::text::jsonb);
-                        """,
-                        req=json.dumps(clean_args, default=list),
-                    )  # type: ignore
-                    result = await conn.fetchval(q, *p)
-
-                if links := result.get("links"):
-                    for link in links:
-                        if link["rel"] == "next":
-                            next_link = link
-                        elif link["rel"] == "prev":
-                            prev_link = link
+            if ranked:
+                search = await self._free_text_search(clean_args, request)
+                result, next_link, prev_link = await self._ranked_collection_search(search, request)
+
+            elif keyset:
+                search = await self._free_text_search(clean_args, request)
+                result, next_link, prev_link = await self._keyset_collection_search(
+                    search, request, backward="before" in page, paged=bool(page)
+                )
+
+            elif self.extension_is_enabled("CollectionSearchExtension"):
+                search = await self._free_text_search(clean_args, request)
+                result = await self._collection_search(search, request)
+                paging_links = {link["rel"]: link for link in result.get("links") or []}
+                next_link, prev_link = paging_links.get("next"), paging_links.get("prev")
 
             else:
                 async with request.app.state.get_connection(request, "r") as conn:
@@ -171,71 +247,140 @@ class EOCClient(CoreCrudClient):
                     )
                     result = {"collections": cols, "links": []}
 
-            linked_collections: List[Collection] = []
-            collections = result["collections"]  # type: ignore[reportTypedDictNotRequiredAccess]
-            if collections:
-                for c in collections:
-                    coll = Collection(**c)
-                    coll["links"] = await CollectionLinks(
-                        collection_id=coll["id"],  # type: ignore[reportTypedDictNotRequiredAccess]
-                        request=request,
-                    ).get_links(extra_links=coll.get("links"))
-
-                    if self.extension_is_enabled("FilterExtension") or self.extension_is_enabled(
-                        "ItemCollectionFilterExtension"
-                    ):
-                        url = urljoin(
-                            base_url,
-                            (
-                                "collections/"
-                                + coll["id"]  # type: ignore[reportTypedDictNotRequiredAccess]
-                                + "/queryables"
-                            ),
-                        )
-                        coll["links"].append(
-                            {
-                                "rel": Relations.queryables.value,
-                                "type": MimeTypes.jsonschema.value,
-                                "title": "Queryables",
-                                "href": url,
-                            }
-                        )
-
-                    linked_collections.append(coll)
-
-            links = await CollectionSearchPagingLinks(
-                request=request,
-                next=next_link,
-                prev=prev_link,
-            ).get_links()
+            if settings.collections_token_pagination and not keyset:
+                for link in filter(None, (next_link, prev_link)):
+                    link["body"] = {"token": encode_token(link["body"])}
 
-            return Collections(
-                collections=linked_collections or [],
-                links=links,
-                numberMatched=result.get("numberMatched", len(linked_collections)),
-                numberReturned=result.get("numberReturned", len(linked_collections)),
+            queryables = self.extension_is_enabled("FilterExtension") or self.extension_is_enabled(
+                "ItemCollectionFilterExtension"
             )
 
-        settings: Settings = request.app.state.settings
+            linked_collections: List[Collection] = result["collections"] or []  # type: ignore
+            with timed("links"), child_span("stac.links"):
+                for c in linked_collections:
+                    c["links"] = collection_links(
+                        base_url,
+                        c["id"],  # type: ignore[reportTypedDictNotRequiredAccess]
+                        c.get("links"),
+                        queryables=queryables,
+                    )
 
-        json_args = json.dumps(clean_args, default=list)
+                links = await CollectionSearchPagingLinks(
+                    request=request,
+                    next=next_link,
+                    prev=prev_link,
+                ).get_links()
 
-        if settings.otel_enabled:
-            from eoapi.stac.middlewares.tracing import (  # pylint: disable=import-outside-toplevel
-                add_stac_attributes_from_search,
+            collections = Collections(
+                collections=linked_collections or [],
+                links=links,
+                numberReturned=result.get("numberReturned", len(linked_collections)),
             )
+            if not keyset:
+                collections["numberMatched"] = result.get("numberMatched", len(linked_collections))
+            return collections
 
-            add_stac_attributes_from_search(json_args, request)
+        add_stac_attributes_from_search(
+            collections=clean_args.get("ids"), cql_filter=clean_args.get("filter")
+        )
 
-        logger.info(
+        logger.debug(
             "STAC: Collection search body",
             extra=get_custom_dimensions({"search_body": clean_args}, request),
         )
 
-        hashed_search = hash(json_args)
-        cache_key = f"{CACHE_KEY_COLLECTIONS}:{hashed_search}"
+        cache_key = search_cache_key(CACHE_KEY_COLLECTIONS, clean_args)
         return await cached_result(_fetch, cache_key, request)
 
+    async def _collection_search(self, search: Dict[str, Any], request: Request) -> Collections:
+        """Run a collection search with pgstac."""
+        async with request.app.state.get_connection(request, "r") as conn:
+            return await conn.fetchval(COLLECTION_SEARCH, json.dumps(search, default=list))
+
+    async def _free_text_search(self, search: Dict[str, Any], request: Request) -> Dict[str, Any]:
+        """
+        Replace the free-text search of a collection search by the ids of the matching collections
+        if the full-text index of collections is installed. The ids are sorted by relevance.
+        """
+        if not search.get("q") or not getattr(request.app.state, "collections_fts", False):
+            return search
+
+        async with request.app.state.get_connection(request, "r") as conn:
+            matching_ids = await free_text_collection_ids(conn, search["q"])
+        return free_text_search(search, matching_ids)
+
+    async def _ranked_collection_search(
+        self, search: Dict[str, Any], request: Request
+    ) -> Tuple[Collections, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Run a free-text collection search sorted by relevance, return the collections with the
+        next and previous links.
+        """
+        ranked_ids: List[str] = search["ids"]
+        offset, limit = search.get("offset") or 0, search["limit"]
+        search = {key: value for key, value in search.items() if key != "offset"}
+
+        if ranked_ids and any(arg in search for arg in FILTER_ARGS):
+            # only keep the collections matching the other filters
+            matched = await self._collection_search(
+                {**search, "fields": {"include": ["id"]}, "limit": len(ranked_ids)}, request
+            )
+            matched_ids = {c["id"] for c in matched["collections"]}  # type: ignore
+            ranked_ids = [id_ for id_ in ranked_ids if id_ in matched_ids]
+
+        page_ids = ranked_ids[offset : offset + limit]
+
+        cols: List[Collection] = []
+        if page_ids:
+            page = await self._collection_search(
+                {**search, "ids": page_ids, "limit": len(page_ids)}, request
+            )
+            rank = {id_: i for i, id_ in enumerate(page_ids)}
+            cols = sorted(page["collections"], key=lambda c: rank[c["id"]])  # type: ignore
+
+        next_link = (
+            {"body": {"offset": offset + limit}} if offset + limit < len(ranked_ids) else None
+        )
+        prev_link = {"body": {"offset": max(offset - limit, 0)}} if offset > 0 else None
+        return (
+            Collections(
+                collections=cols,
+                links=[],
+                numberMatched=len(ranked_ids),
+                numberReturned=len(cols),
+            ),
+            next_link,
+            prev_link,
+        )
+
+    async def _keyset_collection_search(
+        self, search: Dict[str, Any], request: Request, backward: bool, paged: bool
+    ) -> Tuple[Collections, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Run a collection search paginated by keyset, return the collections with the next and
+        previous links. The search of a previous page reads the collections backward. The count of
+        matched collections of `collection_search` is skipped, as it scans all of them.
+        """
+        async with request.app.state.get_connection(request, "r") as conn:
+            cols = await conn.fetchval(COLLECTION_SEARCH_ROWS, json.dumps(search, default=list))
+
+        # the search asks for one extra collection
+        limit = search["limit"] - 1
+        further = len(cols) > limit
+        cols = cols[:limit]
+        if backward:
+            cols.reverse()
+            has_next, has_prev = True, further
+        else:
+            has_next, has_prev = further, paged
+
+        next_link = prev_link = None
+        if cols and has_next:
+            next_link = {"body": {"token": encode_token({"after": cols[-1]["id"]})}}
+        if cols and has_prev:
+            prev_link = {"body": {"token": encode_token({"before": cols[0]["id"]})}}
+        return Collections(collections=cols, links=[]), next_link, prev_link
+
     async def get_collection(
         self,
         collection_id: str,
@@ -267,10 +412,6 @@ class EOCClient(CoreCrudClient):
 
         Override from stac-fastapi-pgstac to cache results and add telemetry.
         """
-        _super: CoreCrudClient = super()
-
-        settings: Settings = request.app.state.settings
-
         collections_with_scopes = get_collections_for_user_scope(request, EOCClient.oidc_auth)
         if not search_request.collections:
             search_request.collections = collections_with_scopes
@@ -278,12 +419,66 @@ class EOCClient(CoreCrudClient):
             search_request.collections = list(
                 set(collections_with_scopes) & set(search_request.collections)
             )
+        search_request = normalize_search(search_request)
+
+        add_stac_attributes_from_search(
+            collections=search_request.collections,
+            ids=search_request.ids,
+            cql_filter=getattr(search_request, "filter_expr", None),
+        )
+
+        logger.debug(
+            "STAC: Item search body",
+            # dumped only if logged
+            extra=get_custom_dimensions({"search_body": search_request}, request),
+        )
+
+        item_collection = await self._cached_search(search_request, request)
+        self._prefetch_next_page(search_request, item_collection, request)
+        self._record_search(search_request, request)
+        return item_collection
+
+    async def _cached_search(
+        self,
+        search_request: PgstacSearch,
+        request: Request,
+    ) -> ItemCollection:
+        """Run the search or get its result from the cache."""
+        _super: CoreCrudClient = super()
+
+        # close searches share the result of their rounded bbox, restricted to their own bbox
+        shared_request = quantize_search(search_request, request.app.state.settings)
+        if shared_request:
+            shared = await self._cached_search(shared_request, request)
+            return clip_search_result(shared, search_request.bbox)  # type: ignore[arg-type]
 
         async def _fetch() -> ItemCollection:
-            result = await _super._search_base(search_request, request=request)  # pylint: disable=protected-access
+            async with AsyncExitStack() as stack:
+                # batch searches bound the amount of searches hitting the database at once
+                semaphore: Optional[asyncio.Semaphore] = getattr(
+                    request.state, "search_semaphore", None
+                )
+                if semaphore:
+                    await stack.enter_async_context(semaphore)
+
+                guard: Optional[SearchCostGuard] = getattr(
+                    request.app.state, "search_cost_guard", None
+                )
+                if guard:
+                    await stack.enter_async_context(guard.admit(search_request, request))
+
+                # the query, the hydration of the items and their links. The search is copied as
+                # pgstac sets its `conf`, which would change the cache keys of its next page
+                with timed("search"), child_span("pgstac.search") as span:
+                    result = await _super._search_base(  # pylint: disable=protected-access
+                        search_request.model_copy(deep=True), request=request
+                    )
+                    if span:
+                        span.set_attribute("stac.items", len(result.get("features") or []))
 
             ts = time.perf_counter()
-            item_collection = ItemCollection(**result)
+            with timed("postprocess"), child_span("stac.validate"):
+                item_collection = ItemCollection(**result)
             te = time.perf_counter()
 
             logger.debug(
@@ -292,23 +487,91 @@ class EOCClient(CoreCrudClient):
             )
             return item_collection
 
-        search_json = search_request.model_dump_json()
+        cache_key = search_cache_key(CACHE_KEY_SEARCH, search_request)
+        collections = search_request.collections or []
 
-        if settings.otel_enabled:
-            from eoapi.stac.middlewares.tracing import (  # pylint: disable=import-outside-toplevel
-                add_stac_attributes_from_search,
-            )
+        # features filtered by the fields extension can't be shared with other searches
+        fields = getattr(search_request, "fields", None)
+        if fields and (fields.include or fields.exclude):
+            return await cached_result(_fetch, cache_key, request, collections)
+        return await cached_search(_fetch, cache_key, request, collections)
 
-            add_stac_attributes_from_search(search_json, request)
+    def _prefetch_next_page(
+        self,
+        search_request: PgstacSearch,
+        item_collection: ItemCollection,
+        request: Request,
+    ) -> None:
+        """
+        Cache the next page of the search in background, if the search only targets
+        collections opted in for prefetch.
+        """
+        prefetcher: Optional[SearchPrefetcher] = getattr(
+            request.app.state, "search_prefetcher", None
+        )
+        if not prefetcher or "token" not in type(search_request).model_fields:
+            return
+
+        prefetch_collections = request.app.state.settings.search_prefetch_collections
+        if "*" not in prefetch_collections and not (
+            search_request.collections
+            and set(search_request.collections) <= set(prefetch_collections)
+        ):
+            return
+
+        token = next_token(item_collection)  # type: ignore[arg-type]
+        if not token:
+            return
+
+        next_request = search_request.model_copy(update={"token": token}, deep=True)
+        prefetcher.schedule(
+            stored_search_key(next_request, request),
+            lambda: self._cached_search(next_request, request),
+        )
 
-        logger.info(
-            "STAC: Item search body",
-            extra=get_custom_dimensions({"search_body": search_json}, request),
+    def _record_search(self, search_request: PgstacSearch, request: Request) -> None:
+        """Count the search for the preload of the most frequent searches."""
+        preloader: Optional[SearchPreloader] = getattr(request.app.state, "search_preloader", None)
+        if not preloader:
+            return
+
+        # the refresh must neither hold the client request nor its credentials, but the paging
+        # links are built from its URL and body
+        path = request.scope["path"].removeprefix(request.scope.get("root_path", ""))
+        scope = internal_scope(request.app, urlsplit(str(request.base_url)), request.method, path)
+        preload_request = Request({**scope, "query_string": request.scope["query_string"]})
+        preload_request._body = getattr(request, "_body", b"")  # pylint: disable=protected-access
+        # searches sharing the result of their rounded search are refreshed through it
+        preloader.record(
+            stored_search_key(search_request, request),
+            lambda: self._cached_search(search_request, preload_request),
         )
 
-        hashed_search = hash(search_json)
-        cache_key = f"{CACHE_KEY_SEARCH}:{hashed_search}"
-        return await cached_result(_fetch, cache_key, request)
+    async def batch_search(
+        self,
+        search_requests: List[PgstacSearch],
+        request: Request,
+        **kwargs: Any,
+    ) -> Dict[str, List[ItemCollection]]:
+        """Run several searches (POST) at once.
+
+        Each search is resolved against the cache, misses are run concurrently with at most
+        `batch_search_concurrency` searches querying the database at the same time.
+        """
+        settings: Settings = request.app.state.settings
+        request.state.search_semaphore = asyncio.Semaphore(settings.batch_search_concurrency)
+
+        # links of each result must point to the search endpoint with its own body
+        search_path = request.scope["path"].rsplit("/batch", 1)[0]
+        bodies = (await request.json())["searches"]
+
+        results = await asyncio.gather(
+            *[
+                self._search_base(search_request, request=sub_request(request, search_path, body))
+                for search_request, body in zip(search_requests, bodies)
+            ]
+        )
+        return {"results": list(results)}
 
     async def item_collection(
         self,
@@ -350,8 +613,6 @@ class EOCClient(CoreCrudClient):
             filter_lang=filter_lang,
         )
 
-        hashed_search = hash(json.dumps(clean_args, default=list))
-
         async def _fetch() -> ItemCollection:
             return await _super.item_collection(  # type: ignore[reportUnknownMemberType]
                 collection_id,
@@ -368,8 +629,10 @@ class EOCClient(CoreCrudClient):
                 **kwargs,
             )
 
-        cache_key = f"{CACHE_KEY_ITEMS}:{hashed_search}"
-        return await cached_result(_fetch, cache_key, request)
+        cache_key = search_cache_key(CACHE_KEY_ITEMS, clean_args)
+        if fields:
+            return await cached_result(_fetch, cache_key, request, [collection_id])
+        return await cached_search(_fetch, cache_key, request, [collection_id])
 
     async def get_item(
         self,
@@ -391,17 +654,70 @@ class EOCClient(CoreCrudClient):
         cache_key = f"{CACHE_KEY_ITEM}:{collection_id}:{item_id}"
         return await cached_result(_fetch, cache_key, request)
 
+    async def get_items(
+        self,
+        items: List[Tuple[str, str]],
+        request: Request,
+        **kwargs: Any,
+    ) -> ItemCollection:
+        """Get items by (collection id, item id) pairs.
+
+        Items are looked up in the cache of `get_item` in one round trip, the missing ones are
+        fetched with a single search and cached.
+        """
+        _super: CoreCrudClient = super()
+
+        items = list(dict.fromkeys(items))
+        for collection_id in {collection_id for collection_id, _ in items}:
+            verify_scope_for_collection(request, collection_id)
+
+        async def _fetch(cache_keys: List[str]) -> Dict[str, Item]:
+            search_request = items_search([keys_items[cache_key] for cache_key in cache_keys])
+            item_collection = await _super._search_base(search_request, request=request)  # pylint: disable=protected-access
+
+            features = {
+                (feature["collection"], feature["id"]): feature  # type: ignore[reportTypedDictNotRequiredAccess]
+                for feature in item_collection["features"]
+            }
+            return {
+                cache_key: Item(**features[keys_items[cache_key]])
+                for cache_key in cache_keys
+                if keys_items[cache_key] in features
+            }
+
+        keys_items = {
+            f"{CACHE_KEY_ITEM}:{collection_id}:{item_id}": (collection_id, item_id)
+            for collection_id, item_id in items
+        }
+        results = await cached_results(_fetch, list(keys_items), request)
+        features = [results[cache_key] for cache_key in keys_items if cache_key in results]
+
+        return ItemCollection(
+            type="FeatureCollection",
+            features=features,
+            links=[],
+            numberReturned=len(features),
+        )
+
 
 T = TypeVar("T")
 
 
+def stored_search_key(search_request: PgstacSearch, request: Request) -> str:
+    """Cache key the result of the search is stored under, the one of its rounded search if any."""
+    shared_request = quantize_search(search_request, request.app.state.settings)
+    return search_cache_key(CACHE_KEY_SEARCH, shared_request or search_request)
+
+
 async def cached_result(
     fn: Callable[..., Coroutine[Any, Any, T]],
     cache_key: str,
     request: Request,
+    collections: Optional[Sequence[str]] = None,
 ) -> T:
     """
-    If Redis is enable, cache result.
+    If Redis is enable, cache result, invalidated on the item writes in the given collections
+    for a search result.
     """
     settings: Settings = request.app.state.settings
 
@@ -410,6 +726,48 @@ async def cached_result(
             cached_result as redis_cached,
         )
 
-        return await redis_cached(fn, cache_key, request)
+        return await redis_cached(fn, cache_key, request, collections)
+
+    return await fn()
+
+
+async def cached_search(
+    fn: Callable[..., Coroutine[Any, Any, ItemCollection]],
+    cache_key: str,
+    request: Request,
+    collections: Sequence[str] = (),
+) -> ItemCollection:
+    """
+    If Redis is enable, cache the search result over the given collections (all of them if
+    empty) with its features stored by item.
+    """
+    settings: Settings = request.app.state.settings
+
+    if settings.redis_enabled:
+        from eoapi.stac.redis import (  # pylint: disable=import-outside-toplevel
+            cached_search as redis_cached,
+        )
+
+        return await redis_cached(fn, cache_key, request, collections)  # type: ignore[return-value]
 
     return await fn()
+
+
+async def cached_results(
+    fn: Callable[[List[str]], Coroutine[Any, Any, Dict[str, T]]],
+    cache_keys: List[str],
+    request: Request,
+) -> Dict[str, T]:
+    """
+    If Redis is enable, cache results, the function is called once with all the missing keys.
+    """
+    settings: Settings = request.app.state.settings
+
+    if settings.redis_enabled:
+        from eoapi.stac.redis import (  # pylint: disable=import-outside-toplevel
+            cached_results as redis_cached,
+        )
+
+        return await redis_cached(fn, cache_keys, request)
+
+    return await fn(cache_keys)
@@ -0,0 +1,146 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Admission control of item searches based on their estimated cost.
+
+Searches are checked before running against the database:
+- searches intersecting geometries with too many points are rejected,
+- the cost of the page of items of the other searches is estimated by the query planner
+  (`EXPLAIN`) on the `WHERE` clause generated by pgstac: searches above the maximum cost are
+  rejected, expensive searches wait for one of a limited number of slots.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import orjson
+from fastapi import HTTPException
+from stac_fastapi.pgstac.types.search import PgstacSearch
+from starlette import status
+from starlette.requests import Request
+
+from eoapi.stac.logs import get_custom_dimensions
+from eoapi.stac.statements import STAC_SEARCH_TO_WHERE, search_cost
+
+logger = logging.getLogger(__name__)
+
+
+def count_points(geometry: Dict[str, Any]) -> int:
+    """Count the points of a GeoJSON geometry."""
+    if geometry.get("type") == "GeometryCollection":
+        return sum(count_points(g) for g in geometry["geometries"])
+
+    def _count(coordinates: Any) -> int:
+        if not coordinates:
+            return 0
+        if not isinstance(coordinates[0], (list, tuple)):
+            return 1
+        return sum(_count(c) for c in coordinates)
+
+    return _count(geometry.get("coordinates"))
+
+
+async def estimate_search_cost(search_request: PgstacSearch, request: Request) -> float:
+    """
+    Estimated cost of the page of items of the search, from the query planner. The page is
+    fetched with one more item to know whether there is a next page.
+    """
+    async with request.app.state.get_connection(request, "r") as conn:
+        where = await conn.fetchval(
+            STAC_SEARCH_TO_WHERE, search_request.model_dump_json(exclude_none=True, by_alias=True)
+        )
+        # not cached, see `search_cost`
+        statement = await conn.prepare(search_cost(where))
+        plan = await statement.fetchval((search_request.limit or 10) + 1)
+
+    if isinstance(plan, str):
+        plan = orjson.loads(plan)  # pylint: disable=no-member
+    return plan[0]["Plan"]["Total Cost"]
+
+
+class SearchCostGuard:
+    """Reject or queue item searches depending on their estimated cost."""
+
+    def __init__(
+        self,
+        max_cost: Optional[float],
+        expensive_cost: Optional[float],
+        expensive_concurrency: int,
+        max_points: Optional[int],
+    ):
+        self.max_cost = max_cost
+        self.expensive_cost = expensive_cost
+        self.max_points = max_points
+        self._expensive = asyncio.Semaphore(expensive_concurrency)
+
+    def check_geometry(self, search_request: PgstacSearch) -> None:
+        """Reject searches intersecting geometries with too many points."""
+        if self.max_points is None or not search_request.intersects:
+            return
+
+        points = count_points(search_request.intersects.model_dump())
+        if points > self.max_points:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"The intersects geometry has {points} points, more than the maximum "
+                    f"of {self.max_points}: simplify it or search its bbox."
+                ),
+            )
+
+    @asynccontextmanager
+    async def admit(self, search_request: PgstacSearch, request: Request) -> AsyncIterator[None]:
+        """
+        Wait until the search can run.
+        Raises:
+            HTTPException if the search is too expensive
+        """
+        self.check_geometry(search_request)
+
+        if self.max_cost is None and self.expensive_cost is None:
+            yield
+            return
+
+        cost = await estimate_search_cost(search_request, request)
+        if self.max_cost is not None and cost > self.max_cost:
+            logger.warning(
+                "Search rejected: estimated cost %.0f",
+                cost,
+                extra=get_custom_dimensions({"search_cost": cost}, request),
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"The search is too expensive (estimated cost {cost:.0f}, maximum "
+                    f"{self.max_cost:.0f}): restrict it with collections, a datetime interval "
+                    "or a bbox."
+                ),
+            )
+
+        if self.expensive_cost is not None and cost > self.expensive_cost:
+            logger.info(
+                "Search queued: estimated cost %.0f",
+                cost,
+                extra=get_custom_dimensions({"search_cost": cost}, request),
+            )
+            async with self._expensive:
+                yield
+        else:
+            yield
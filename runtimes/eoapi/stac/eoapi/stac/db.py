@@ -0,0 +1,244 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Database connections."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+import attr
+from asyncpg import Connection, Pool
+from stac_fastapi.pgstac.db import translate_pgstac_errors
+from starlette.requests import Request
+
+from eoapi.stac.logs import get_request_entity
+from eoapi.stac.middlewares.server_timing import record_timing, timed
+from eoapi.stac.middlewares.timeout import remaining_time
+from eoapi.stac.middlewares.tracing import child_span
+from eoapi.stac.utils import get_request_ip
+
+logger = logging.getLogger(__name__)
+
+# replication lag in seconds of a reader, 0 if it replayed all the WAL it received
+REPLICATION_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END;
+"""
+
+# maximum number of request entities whose last write is remembered
+MAX_WRITERS = 10000
+
+
+@attr.s
+class Reader:
+    """Connection pool to a read-only service."""
+
+    # name of the reader in logs and pool statistics
+    name: str = attr.ib()
+    pool: Pool = attr.ib()
+    outstanding: int = attr.ib(default=0)
+    lag: float = attr.ib(default=0.0)
+    # monotonic time of the lag measure
+    measured_at: float = attr.ib(default=0.0)
+
+    def replayed(self, since: float) -> bool:
+        """Whether the reader replayed the transactions committed up to the given monotonic time."""
+        return self.measured_at - self.lag >= since
+
+
+@attr.s
+class PoolStats:
+    """Connection acquisitions from a pool by the instance."""
+
+    acquisitions: int = attr.ib(default=0)
+    timeouts: int = attr.ib(default=0)
+    waiting: int = attr.ib(default=0)
+    wait_seconds: float = attr.ib(default=0.0)
+    max_wait_seconds: float = attr.ib(default=0.0)
+
+    def record(self, wait: float) -> None:
+        """Record the time waited for a connection."""
+        self.acquisitions += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def as_dict(self, pool: Pool) -> Dict[str, Any]:
+        """Return the acquisitions and the connections of the pool."""
+        return {
+            "size": pool.get_size(),
+            "max_size": pool.get_max_size(),
+            "in_use": pool.get_size() - pool.get_idle_size(),
+            "waiting": self.waiting,
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "mean_wait_seconds": round(self.wait_seconds / max(self.acquisitions, 1), 6),
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+        }
+
+
+# statistics by pool name: "reader", "writer" or the name of an additional reader
+pool_stats: Dict[str, PoolStats] = defaultdict(PoolStats)
+
+
+class ReaderPools:
+    """
+    Balance reads between several readers, by least outstanding connections among the readers
+    whose replication lag is acceptable, or read from the writer if none is.
+    Reads of a request entity which wrote recently only go to readers which caught up with its
+    write, or to the writer if none did.
+    """
+
+    def __init__(self, readers: List[Reader], max_lag: float, read_after_write_window: float):
+        self.readers = readers
+        self.max_lag = max_lag
+        self.read_after_write_window = read_after_write_window
+        self._writes: OrderedDict[str, float] = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def record_write(self, entity: str) -> None:
+        """Remember the time of the last write of a request entity."""
+        self._writes.pop(entity, None)
+        self._writes[entity] = time.monotonic()
+        if len(self._writes) > MAX_WRITERS:
+            self._writes.popitem(last=False)
+
+    def pick(self, entity: Optional[str]) -> Optional[Reader]:
+        """Reader for a read of the request entity, None to read from the writer."""
+        if entity is not None and (written := self._writes.get(entity)) is not None:
+            if time.monotonic() - written < self.read_after_write_window:
+                candidates = [
+                    r for r in self.readers if r.lag <= self.max_lag and r.replayed(written)
+                ]
+                return min(candidates, key=lambda r: r.outstanding) if candidates else None
+
+        # unreachable readers have an infinite lag
+        candidates = [r for r in self.readers if r.lag <= self.max_lag]
+        return min(candidates, key=lambda r: r.outstanding) if candidates else None
+
+    async def measure_lag(self) -> None:
+        """Measure the replication lag of the readers."""
+        for reader in self.readers:
+            try:
+                reader.lag = float(await reader.pool.fetchval(REPLICATION_LAG_QUERY))
+                reader.measured_at = time.monotonic()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # an unreachable reader is avoided until it answers again
+                logger.warning("Replication lag of %s: %s", reader.name, e)
+                reader.lag = float("inf")
+
+    def start(self, interval: float) -> None:
+        """Measure the replication lag of the readers periodically."""
+
+        async def _measure() -> None:
+            while True:
+                await self.measure_lag()
+                await asyncio.sleep(interval)
+
+        self._task = asyncio.create_task(_measure())
+
+    async def close(self) -> None:
+        """Stop measuring the lag and close the pools, except the default reader one."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await asyncio.gather(*(reader.pool.close() for reader in self.readers[1:]))
+
+
+def pool_statistics(app: Any) -> Dict[str, Dict[str, Any]]:
+    """Connections and connection acquisitions of the database pools of the instance, by name."""
+    pools = {"reader": app.state.readpool, "writer": app.state.writepool}
+    if reader_pools := getattr(app.state, "reader_pools", None):
+        pools.update({reader.name: reader.pool for reader in reader_pools.readers[1:]})
+    return {name: pool_stats[name].as_dict(pool) for name, pool in pools.items()}
+
+
+def _request_entity(request: Request) -> Optional[str]:
+    """Entity of a request, None for the internal requests of the application."""
+    if "headers" not in request.scope:
+        return None
+    return get_request_entity(request) or get_request_ip(request)
+
+
+async def _acquire(pool: Pool, stats: PoolStats, name: str) -> Connection:
+    """Acquire a connection from the pool, within the time left to the request if any."""
+    stats.waiting += 1
+    start = time.perf_counter()
+    try:
+        with child_span("db.acquire", {"db.pool": name}):
+            conn = await pool.acquire(timeout=remaining_time())
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        raise
+    finally:
+        stats.waiting -= 1
+    wait = time.perf_counter() - start
+    stats.record(wait)
+    record_timing("db-wait", wait)
+    return conn
+
+
+@asynccontextmanager
+async def get_connection(
+    request: Request,
+    readwrite: Literal["r", "w"] = "r",
+) -> AsyncIterator[Connection]:
+    """
+    Retrieve a connection from the database connection pool.
+    Within a request with timeout, the statement timeout of the connection is set to the time left,
+    so that postgres cancels the queries still running when the request times out. It is reset
+    when the connection is released to the pool.
+    """
+    pool = request.app.state.writepool if readwrite == "w" else request.app.state.readpool
+
+    reader: Optional[Reader] = None
+    readers: Optional[ReaderPools] = getattr(request.app.state, "reader_pools", None)
+    if readers:
+        entity = _request_entity(request)
+        if readwrite == "w":
+            if entity is not None:
+                readers.record_write(entity)
+        else:
+            reader = readers.pick(entity)
+            pool = reader.pool if reader else request.app.state.writepool
+
+    if reader:
+        name = reader.name
+        reader.outstanding += 1
+    else:
+        name = "writer" if pool is request.app.state.writepool else "reader"
+    try:
+        with translate_pgstac_errors():
+            conn = await _acquire(pool, pool_stats[name], name)
+            try:
+                remaining = remaining_time()
+                if remaining is not None:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    await conn.execute(f"SET statement_timeout = {max(int(remaining * 1000), 1)}")
+                with timed("db"), child_span("pgstac.query", {"db.pool": name}):
+                    yield conn
+            finally:
+                await pool.release(conn)
+    finally:
+        if reader:
+            reader.outstanding -= 1
@@ -0,0 +1,141 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Batch extension."""
+
+from typing import Any, Dict, List, Type
+
+import attr
+from fastapi import APIRouter, FastAPI
+from pydantic import BaseModel, Field, create_model
+from stac_fastapi.types.extension import ApiExtension
+from starlette.requests import Request
+
+from eoapi.stac.core import EOCClient
+from eoapi.stac.middlewares.server_timing import TimedORJSONResponse
+
+
+class ItemReference(BaseModel):
+    """Reference of an item in a collection."""
+
+    collection: str
+    id: str
+
+
+@attr.s(kw_only=True)
+class BatchSearchExtension(ApiExtension):
+    """
+    Batch search extension, run several item searches in a single request:
+    `POST /search/batch` with `{"searches": [<search body>, ...]}`.
+    """
+
+    client: EOCClient = attr.ib()
+    search_post_request_model: Type[BaseModel] = attr.ib()
+    max_searches: int = attr.ib(default=20)
+    router: APIRouter = attr.ib(factory=APIRouter)
+
+    def register(self, app: FastAPI) -> None:
+        """Register the extension with a FastAPI application.
+        Args:
+            app: target FastAPI application.
+        Returns:
+            None
+
+        """
+        self.router.prefix = app.state.router_prefix
+
+        batch_request_model = create_model(
+            "BatchSearchRequest",
+            searches=(
+                List[self.search_post_request_model],  # type: ignore[name-defined]
+                Field(min_length=1, max_length=self.max_searches),
+            ),
+        )
+
+        @self.router.post(
+            "/search/batch",
+            response_class=TimedORJSONResponse,
+            responses={
+                200: {
+                    "description": "Results of the searches, in the order of the request.",
+                    "content": {"application/json": {}},
+                }
+            },
+        )
+        async def batch_search(
+            request: Request,
+            batch_request: batch_request_model,  # type: ignore[valid-type]
+        ) -> Dict[str, List[Any]]:
+            """Run several item searches at once."""
+            return await self.client.batch_search(
+                batch_request.searches,  # type: ignore[attr-defined]
+                request=request,
+            )
+
+        app.include_router(self.router, tags=["Batch Extension"])
+
+
+@attr.s(kw_only=True)
+class BatchItemsExtension(ApiExtension):
+    """
+    Batch items extension, get several items of any collections in a single request:
+    `POST /items/batch` with `{"items": [{"collection": <collection id>, "id": <item id>}, ...]}`.
+    """
+
+    client: EOCClient = attr.ib()
+    max_items: int = attr.ib(default=250)
+    router: APIRouter = attr.ib(factory=APIRouter)
+
+    def register(self, app: FastAPI) -> None:
+        """Register the extension with a FastAPI application.
+        Args:
+            app: target FastAPI application.
+        Returns:
+            None
+
+        """
+        self.router.prefix = app.state.router_prefix
+
+        batch_request_model = create_model(
+            "BatchItemsRequest",
+            items=(List[ItemReference], Field(min_length=1, max_length=self.max_items)),
+        )
+
+        @self.router.post(
+            "/items/batch",
+            response_class=TimedORJSONResponse,
+            responses={
+                200: {
+                    "description": "Items found, in the order of the request.",
+                    "content": {"application/geo+json": {}},
+                }
+            },
+        )
+        async def batch_items(
+            request: Request,
+            batch_request: batch_request_model,  # type: ignore[valid-type]
+        ) -> Dict[str, Any]:
+            """Get several items at once, unknown items are left out of the response."""
+            return await self.client.get_items(  # type: ignore[return-value]
+                [
+                    (item.collection, item.id)
+                    for item in batch_request.items  # type: ignore[attr-defined]
+                ],
+                request=request,
+            )
+
+        app.include_router(self.router, tags=["Batch Extension"])
@@ -15,20 +15,39 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from fastapi import Request
+from stac_fastapi.api.models import JSONSchemaResponse
 from stac_fastapi.pgstac.extensions.filter import FiltersClient as BaseFiltersClient
+from starlette import status
+from starlette.responses import Response
 
 from eoapi.stac.constants import CACHE_KEY_QUERYABLES
 from eoapi.stac.core import cached_result
+from eoapi.stac.middlewares.conditional import etag_matches
+from eoapi.stac.queryables import QueryablesStore
 
 
 class FiltersClient(BaseFiltersClient):
     async def get_queryables(
         self, request: Request, collection_id: Optional[str] = None, **kwargs: Any
-    ) -> Dict[str, Any]:
-        """Override pgstac backend get_queryables to make use of cached results"""
+    ) -> Union[Dict[str, Any], Response]:
+        """
+        Override pgstac backend get_queryables to make use of precomputed queryables if enabled,
+        cached results otherwise
+        """
+        store: Optional[QueryablesStore] = getattr(request.app.state, "queryables", None)
+        if store and (queryables := store.get(collection_id)):
+            headers = {"ETag": queryables.etag}
+            if (if_none_match := request.headers.get("if-none-match")) and etag_matches(
+                queryables.etag, if_none_match
+            ):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return JSONSchemaResponse(
+                {**queryables.content, "$id": str(request.url)}, headers=headers
+            )
+
         _super: BaseFiltersClient = super()
 
         async def _fetch() -> Dict[str, Any]:
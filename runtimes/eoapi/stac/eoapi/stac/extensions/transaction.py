@@ -16,35 +16,111 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Optional, Union
+from typing import List, Optional, Sequence, Union
 
+from stac_fastapi.extensions.third_party.bulk_transactions import Items
 from stac_fastapi.pgstac.db import dbfunc
 from stac_fastapi.pgstac.models.links import CollectionLinks
-from stac_fastapi.pgstac.transactions import TransactionsClient
+from stac_fastapi.pgstac.transactions import BulkTransactionsClient, TransactionsClient
 from stac_fastapi.types import stac as stac_types
-from stac_pydantic import Collection
+from stac_pydantic import Collection, Item, ItemCollection
 from starlette.requests import Request
 from starlette.responses import Response
 
 from eoapi.stac.auth import CollectionsScopes
 from eoapi.stac.config import Settings
-from eoapi.stac.constants import CACHE_KEY_COLLECTIONS
+from eoapi.stac.constants import (
+    CACHE_KEY_COLLECTION,
+    CACHE_KEY_COLLECTIONS,
+    CACHE_KEY_ITEM,
+    CACHE_KEY_LANDING,
+    CACHE_KEY_QUERYABLES,
+    CACHE_KEY_SEARCH_INDEXES,
+    CACHE_KEY_SEARCH_RESULTS,
+)
 from eoapi.stac.utils import fetch_all_collections_with_scopes
 
 
-async def _update_collection_scopes(request: Request):
+async def _invalidate_cache(
+    request: Request,
+    cache_keys: List[str],
+    key_prefixes: Sequence[str] = (),
+    search_sets: Sequence[str] = (),
+    generations: Sequence[str] = (),
+):
     """
-    updates the cached collection scopes in memory and possibly also in redis (depending on app settings)
+    deletes the given keys from the redis cache (if enabled)
     Args:
         request: starlette request used to check the app settings
+        cache_keys: keys to delete
+        key_prefixes: prefixes of the keys to delete
+        search_sets: sets of the cached searches to delete
+        generations: resources whose response validators are dropped
     """
     settings: Settings = request.app.state.settings
     if settings.redis_enabled:
-        r = request.app.state.redis
-        r.delete(f"{CACHE_KEY_COLLECTIONS}_all")
+        from eoapi.stac.redis import invalidate  # pylint: disable=import-outside-toplevel
+
+        await invalidate(cache_keys, request, key_prefixes, search_sets, generations)
+
+
+def _search_sets(collection_id: str, indexes: bool) -> List[str]:
+    """
+    sets of the cached searches which may hold items of the collection: the searches over the
+    collection and over all the collections, only the ones stored with their features unless
+    the search indexes are requested
+    """
+    set_keys = [CACHE_KEY_SEARCH_RESULTS] + ([CACHE_KEY_SEARCH_INDEXES] if indexes else [])
+    return [key for set_key in set_keys for key in (f"{set_key}:{collection_id}", set_key)]
+
+
+async def _invalidate_items(
+    request: Request, collection_id: str, item_ids: List[str], created: bool = False
+):
+    """
+    deletes the given items from the redis cache (if enabled): the search indexes referencing
+    them now miss, the searches stored with their features are deleted. Created items may also
+    match the other searches of the collection, which are deleted too
+    Args:
+        request: starlette request used to check the app settings
+        collection_id: collection of the items
+        item_ids: ids of the written items
+        created: whether the items were created
+    """
+    await _invalidate_cache(
+        request,
+        [f"{CACHE_KEY_ITEM}:{collection_id}:{item_id}" for item_id in item_ids],
+        search_sets=_search_sets(collection_id, indexes=created),
+        generations=[f"items:{collection_id}"],
+    )
+
+
+async def _update_collection_scopes(request: Request, collection_id: str):
+    """
+    updates the cached collection scopes in memory and possibly also in redis (depending on app settings)
+    the cached responses listing or describing the collection are invalidated before the warm-up
+    Args:
+        request: starlette request used to check the app settings
+        collection_id: id of the created, updated or deleted collection
+    """
+    settings: Settings = request.app.state.settings
+    await _invalidate_cache(
+        request,
+        [
+            f"{CACHE_KEY_COLLECTIONS}_all",
+            CACHE_KEY_LANDING,
+            f"{CACHE_KEY_COLLECTION}:{collection_id}",
+        ],
+        [CACHE_KEY_COLLECTIONS, CACHE_KEY_QUERYABLES],
+        generations=["landing", "collections", "queryables"],
+    )
     collections = await fetch_all_collections_with_scopes(request)
     CollectionsScopes(collections, settings.eoapi_auth_metadata_field).set_scopes_for_collections()
 
+    # the cached collections were invalidated
+    if cache_warmer := getattr(request.app.state, "cache_warmer", None):
+        cache_warmer.schedule()
+
 
 class EoApiTransactionsClient(TransactionsClient):
     async def create_collection(
@@ -67,7 +143,7 @@ class EoApiTransactionsClient(TransactionsClient):
             collection_id=collection["id"], request=request
         ).get_links(extra_links=collection["links"])
 
-        await _update_collection_scopes(request)
+        await _update_collection_scopes(request, collection["id"])
 
         return stac_types.Collection(**collection)
 
@@ -90,6 +166,88 @@ class EoApiTransactionsClient(TransactionsClient):
             extra_links=col.get("links")
         )
 
-        await _update_collection_scopes(request)
+        await _update_collection_scopes(request, col["id"])
 
         return stac_types.Collection(**col)
+
+    async def delete_collection(
+        self,
+        collection_id: str,
+        request: Request,
+        **kwargs,
+    ) -> Optional[Union[stac_types.Collection, Response]]:
+        """Delete collection; called with DELETE /collections/{collection_id}
+        overwrites delete_collection from stac_fastapi to ensure that cached scopes are updated
+        """
+        result = await super().delete_collection(collection_id, request, **kwargs)
+        # the items of the collection are deleted with it
+        await _invalidate_cache(
+            request,
+            [],
+            search_sets=_search_sets(collection_id, indexes=True),
+            generations=[f"items:{collection_id}"],
+        )
+        await _update_collection_scopes(request, collection_id)
+        return result
+
+    async def create_item(
+        self,
+        collection_id: str,
+        item: Union[Item, ItemCollection],
+        request: Request,
+        **kwargs,
+    ) -> Optional[Union[stac_types.Item, Response]]:
+        """Create item or items; called with POST /collections/{collection_id}/items
+        overwrites create_item from stac_fastapi to invalidate the cached items, which may be
+        replaced, and the searches of the collection
+        """
+        item_ids = (
+            [feature.id for feature in item.features]
+            if isinstance(item, ItemCollection)
+            else [item.id]
+        )
+        result = await super().create_item(collection_id, item, request, **kwargs)
+        await _invalidate_items(request, collection_id, [i for i in item_ids if i], created=True)
+        return result
+
+    async def update_item(
+        self,
+        request: Request,
+        collection_id: str,
+        item_id: str,
+        item: Item,
+        **kwargs,
+    ) -> Optional[Union[stac_types.Item, Response]]:
+        """Update item; called with PUT /collections/{collection_id}/items/{item_id}
+        overwrites update_item from stac_fastapi to invalidate the cached item
+        """
+        result = await super().update_item(request, collection_id, item_id, item, **kwargs)
+        await _invalidate_items(request, collection_id, [item_id])
+        return result
+
+    async def delete_item(
+        self,
+        item_id: str,
+        collection_id: str,
+        request: Request,
+        **kwargs,
+    ) -> Optional[Union[stac_types.Item, Response]]:
+        """Delete item; called with DELETE /collections/{collection_id}/items/{item_id}
+        overwrites delete_item from stac_fastapi to invalidate the cached item
+        """
+        result = await super().delete_item(item_id, collection_id, request, **kwargs)
+        await _invalidate_items(request, collection_id, [item_id])
+        return result
+
+
+class EoApiBulkTransactionsClient(BulkTransactionsClient):
+    async def bulk_item_insert(self, items: Items, request: Request, **kwargs) -> str:
+        """Insert or upsert items; called with POST /collections/{collection_id}/bulk_items
+        overwrites bulk_item_insert from stac_fastapi to invalidate the cached items, which may
+        be replaced, and the searches of the collection
+        """
+        result = await super().bulk_item_insert(items, request, **kwargs)
+        await _invalidate_items(
+            request, request.path_params["collection_id"], list(items.items), created=True
+        )
+        return result
@@ -0,0 +1,69 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Free-text collection search backed by the optional full-text index of `sql/collections_fts.sql`.
+
+The free-text search of pgstac's `collection_search` builds the text vectors of all the
+collections on each search. When the index is present, the free-text search is run on the index
+first and replaced by the ids of the matching collections.
+"""
+
+import json
+from typing import Any, Dict, List
+
+from asyncpg import Connection
+
+COLLECTIONS_FTS_INDEX = "collections_fts_idx"
+
+# filters which may discard collections matching the free-text search
+FILTER_ARGS = ("bbox", "datetime", "query", "filter")
+
+
+async def has_collections_fts_index(conn: Connection) -> bool:
+    """Whether the full-text index of the collections is installed."""
+    return await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", COLLECTIONS_FTS_INDEX)
+
+
+async def free_text_collection_ids(conn: Connection, q: List[str]) -> List[str]:
+    """Ids of the collections matching a free-text search, most relevant first."""
+    return await conn.fetchval(
+        """
+        SELECT coalesce(jsonb_agg(id ORDER BY rank DESC, id), '[]')
+        FROM (
+            SELECT id, ts_rank(collection_tsvector(content), query) AS rank
+            FROM collections, q_to_tsquery($1::text::jsonb) AS query
+            WHERE collection_tsvector(content) @@ query
+        ) AS matches;
+        """,
+        json.dumps(q),
+    )
+
+
+def free_text_search(clean_args: Dict[str, Any], matching_ids: List[str]) -> Dict[str, Any]:
+    """Replace the free-text search by the ids of the matching collections."""
+    search = {key: value for key, value in clean_args.items() if key != "q"}
+    if allowed := search.get("ids"):
+        allowed_ids = set(allowed)
+        matching_ids = [id_ for id_ in matching_ids if id_ in allowed_ids]
+    search["ids"] = matching_ids
+    return search
+
+
+def is_ranked(clean_args: Dict[str, Any], ranking: bool) -> bool:
+    """Whether the results of a free-text search are sorted by relevance."""
+    return ranking and bool(clean_args.get("q")) and not clean_args.get("sortby")
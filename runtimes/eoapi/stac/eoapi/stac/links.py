@@ -0,0 +1,97 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Memoized links of collections.
+
+The inferred links of a collection only depend on the base URL of the request and on the
+collection id, so they are generated once and patched onto the collections returned by pgstac.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import attr
+from stac_fastapi.pgstac.models.links import INFERRED_LINK_RELS, CollectionLinks
+from stac_fastapi.types.core import Relations
+from stac_pydantic.shared import MimeTypes
+
+LINKS_CACHE_SIZE = 8192
+
+
+@attr.s
+class _TemplateCollectionLinks(CollectionLinks):
+    """Collection links built from a base URL rather than from a request."""
+
+    template_base_url: str = attr.ib(kw_only=True)
+
+    @property
+    def base_url(self) -> str:
+        """Get the base url."""
+        return self.template_base_url
+
+
+@lru_cache(maxsize=LINKS_CACHE_SIZE)
+def collection_inferred_links(base_url: str, collection_id: str) -> Tuple[Dict[str, Any], ...]:
+    """Inferred links of a collection (self, parent, items and root)."""
+    return tuple(
+        _TemplateCollectionLinks(  # type: ignore[call-arg]
+            request=None,  # type: ignore[arg-type]
+            collection_id=collection_id,
+            template_base_url=base_url,
+        ).create_links()
+    )
+
+
+@lru_cache(maxsize=LINKS_CACHE_SIZE)
+def collection_queryables_link(base_url: str, collection_id: str) -> Dict[str, Any]:
+    """Queryables link of a collection."""
+    return {
+        "rel": Relations.queryables.value,
+        "type": MimeTypes.jsonschema.value,
+        "title": "Queryables",
+        "href": urljoin(base_url, f"collections/{collection_id}/queryables"),
+    }
+
+
+@lru_cache(maxsize=LINKS_CACHE_SIZE)
+def _resolve(base_url: str, href: str) -> str:
+    return urljoin(base_url, href)
+
+
+def collection_links(
+    base_url: str,
+    collection_id: str,
+    extra_links: Optional[List[Dict[str, Any]]],
+    queryables: bool,
+) -> List[Dict[str, Any]]:
+    """
+    Links of a collection, same as `CollectionLinks.get_links` followed by the queryables link
+    if enabled.
+    The inferred links are shared between responses and must not be modified.
+    """
+    links = list(collection_inferred_links(base_url, collection_id))
+    if extra_links:
+        links += [
+            {**link, "href": _resolve(base_url, link["href"])}
+            for link in extra_links
+            if link["rel"] not in INFERRED_LINK_RELS
+        ]
+    if queryables:
+        links.append(collection_queryables_link(base_url, collection_id))
+    return links
@@ -6,10 +6,17 @@ https://github.com/microsoft/planetary-computer-apis/blob/main/pccommon/pccommon
 
 from __future__ import annotations
 
+import atexit
+import copy
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union, cast
 
+import orjson
+from pydantic import BaseModel
+
 from eoapi.stac.constants import (
     HTTP_METHOD,
     HTTP_PATH,
@@ -17,36 +24,73 @@ from eoapi.stac.constants import (
     QS_REQUEST_ENTITY,
     X_REQUEST_ENTITY,
 )
-from eoapi.stac.utils import request_to_path
 
 if TYPE_CHECKING:
     from fastapi import Request
 
 
-# Custom filter that outputs custom_dimensions, only if present
-class OptionalCustomDimensionsFilter(logging.Formatter):
-    def __init__(
-        self,
-        message_fmt: Optional[str],
-        dt_fmt: Optional[str],
-        service_name: Optional[str],
-    ):
-        logging.Formatter.__init__(self, message_fmt, dt_fmt)
+class RequestDimensions:
+    """
+    Custom dimensions of a log record about a request. The dimensions of the request itself are
+    only built if the record is emitted.
+    """
+
+    __slots__ = ("dimensions", "request")
+
+    def __init__(self, dimensions: Dict[str, Any], request: Request):
+        self.dimensions = dimensions
+        self.request = request
+
+    def resolve(self) -> Dict[str, Any]:
+        """
+        Merge the base dimensions of the request with the given dimensions, dumping the models
+        (e.g. the search bodies) as they may change once logged.
+        """
+        request = self.request
+        base_dimensions: Dict[str, Any] = {
+            "request_entity": get_request_entity(request),
+            HTTP_URL: str(request.url),
+            HTTP_METHOD: request.method,
+            HTTP_PATH: request.url.path,
+        }
+        for name, value in self.dimensions.items():
+            base_dimensions[name] = (
+                value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+            )
+        return base_dimensions
+
+
+# JSON lines formatter, with the custom dimensions only if present
+class JsonLinesFormatter(logging.Formatter):
+    def __init__(self, service_name: Optional[str]):
+        logging.Formatter.__init__(self)
         self.service_name = service_name
 
     def format(self, record: logging.LogRecord) -> str:
-        if "custom_dimensions" not in record.__dict__:
-            record.__dict__["custom_dimensions"] = ""
-        else:
+        entry: Dict[str, Any] = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if custom_dimensions := record.__dict__.get("custom_dimensions"):
             # Add the service name to custom_dimensions, so it's queryable
-            record.__dict__["custom_dimensions"]["service"] = self.service_name
-        return super().format(record)
+            entry["custom_dimensions"] = {**custom_dimensions, "service": self.service_name}
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()  # pylint: disable=no-member
 
 
-# Log filter for targeted messages (containing custom_dimensions)
-class CustomDimensionsFilter(logging.Filter):
-    def filter(self, record: logging.LogRecord) -> bool:
-        return bool(record.__dict__["custom_dimensions"])
+# Hand the records over to the logging thread, after building what depends on the request
+class RequestQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        custom_dimensions = record.__dict__.get("custom_dimensions")
+        if isinstance(custom_dimensions, RequestDimensions):
+            record.__dict__["custom_dimensions"] = custom_dimensions.resolve()
+        return record
 
 
 # Prevent successful health check pings from being logged
@@ -64,28 +108,25 @@ class HealthCheckFilter(logging.Filter):
         return True
 
 
-# Initialize logging, including a console handler, and sending all logs containing
-# custom_dimensions to Application Insights
+# Initialize logging: the records of the application are written as JSON lines to the console by
+# a background thread, so that the event loop never waits for the console
 def init_logging(service_name: str, debug: bool = False) -> None:
     # Exclude health check endpoint pings from the uvicorn logs
     logging.getLogger("uvicorn.access").addFilter(HealthCheckFilter())
 
-    logger = logging.getLogger("eo_catalog.stac")
-    logger.setLevel(logging.INFO)
+    logger = logging.getLogger("eoapi.stac")
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
-    # Console log handler that includes custom dimensions
     consoleHandler = logging.StreamHandler(sys.stdout)
-    consoleHandler.setLevel(logging.DEBUG)
-    formatter = OptionalCustomDimensionsFilter(
-        "[%(levelname)s] %(asctime)s - %(message)s %(custom_dimensions)s",
-        None,
-        service_name,
-    )
-    consoleHandler.setFormatter(formatter)
-    logger.addHandler(consoleHandler)
+    consoleHandler.setFormatter(JsonLinesFormatter(service_name))
 
-    if debug:
-        logger.setLevel(logging.DEBUG)
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(records, consoleHandler)
+    listener.start()
+    # flush the pending records at exit
+    atexit.register(listener.stop)
+    logger.addHandler(RequestQueueHandler(records))
+    logger.propagate = False
 
 
 def get_request_entity(request: Request) -> Union[str, None]:
@@ -97,16 +138,6 @@ def get_request_entity(request: Request) -> Union[str, None]:
 
 def get_custom_dimensions(
     dimensions: Dict[str, Any], request: Request
-) -> dict[str, dict[str, Any]]:
-    """Merge the base dimensions with the given dimensions."""
-    settings = request.app.state.settings
-
-    base_dimensions = {
-        "request_entity": get_request_entity(request),
-        "service": settings.otel_service_name,
-        HTTP_URL: str(request.url),
-        HTTP_METHOD: str(request.method),
-        HTTP_PATH: request_to_path(request),
-    }
-    base_dimensions.update(dimensions)
-    return {"custom_dimensions": base_dimensions}
+) -> Dict[str, RequestDimensions]:
+    """Custom dimensions of a log record about the request, built if the record is emitted."""
+    return {"custom_dimensions": RequestDimensions(dimensions, request)}
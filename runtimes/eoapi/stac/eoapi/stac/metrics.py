@@ -0,0 +1,33 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Prometheus metrics of the STAC API, see `eoapi.metrics.prometheus`, with the statistics of the
+instance (cache, database pools, rate limiting).
+"""
+
+from eoapi.metrics.prometheus import EventLoopLagProbe, MetricsMiddleware
+from eoapi.metrics.prometheus import StatisticsCollector as BaseStatisticsCollector
+
+__all__ = ["EventLoopLagProbe", "MetricsMiddleware", "StatisticsCollector"]
+
+
+class StatisticsCollector(BaseStatisticsCollector):
+    # statistics growing monotonically, exported as counters
+    counters = frozenset(
+        {"hits", "misses", "acquisitions", "timeouts", "allowed", "rate_limited", "shed"}
+    )
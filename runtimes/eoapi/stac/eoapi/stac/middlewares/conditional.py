@@ -0,0 +1,233 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+"""
+Conditional requests middleware.
+
+Responses of the landing page, collections, items and queryables get:
+- a weak `ETag`, a digest of their uncompressed body: the middleware runs inside the compression,
+  so the compressed encodings of a response share its ETag,
+- a `Cache-Control` header depending on the type of the resource,
+- with Redis, a `Last-Modified` date: the time their ETag was first seen.
+
+Requests whose `If-None-Match` (or `If-Modified-Since`) matches get a 304 response. With Redis, the
+validators of the responses are shared between the instances, and a matching request gets its 304
+response before the application runs, without any database query or cached payload fetch. The
+validators are dropped on each cache invalidation by the transaction endpoints, through a
+generation counter.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from eoapi.stac.constants import CACHE_KEY_GENERATION, CACHE_KEY_VALIDATOR
+from eoapi.stac.middlewares.server_timing import timed
+from eoapi.stac.middlewares.tracing import child_span
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_PATHS = [
+    ("landing", re.compile(r"^/?$")),
+    ("collections", re.compile(r"^/collections/?$")),
+    ("collections", re.compile(r"^/collections/[^/]+/?$")),
+    ("queryables", re.compile(r"^(/collections/[^/]+)?/queryables/?$")),
+    ("items", re.compile(r"^/collections/[^/]+/items/[^/]+/?$")),
+]
+
+
+def _resource_path(scope: Scope) -> str:
+    path: str = scope["path"]
+    root_path: str = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+    return path
+
+
+def resource_type(scope: Scope) -> Optional[str]:
+    """Type of the resource requested, None if it doesn't support conditional requests."""
+    path = _resource_path(scope)
+    for resource, pattern in RESOURCE_PATHS:
+        if pattern.match(path):
+            return resource
+    return None
+
+
+def resource_generation(scope: Scope, resource: str) -> str:
+    """Generation of the validators of the resource, by collection for the items."""
+    if resource == "items":
+        return f"items:{_resource_path(scope).strip('/').split('/')[1]}"
+    return resource
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison of the ETag with the ones of an `If-None-Match` header."""
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(headers: Headers, etag: str, last_modified: Optional[float]) -> bool:
+    """Whether the client copy of the resource is still valid."""
+    if if_none_match := headers.get("if-none-match"):
+        return etag_matches(etag, if_none_match)
+    if last_modified is not None and (if_modified_since := headers.get("if-modified-since")):
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def set_validator_headers(
+    headers: MutableHeaders, cachecontrol: str, validator: Dict[str, Any]
+) -> None:
+    """Set the validators and the cache directives of a response."""
+    headers["ETag"] = validator["etag"]
+    if validator["last_modified"] is not None:
+        headers["Last-Modified"] = formatdate(validator["last_modified"], usegmt=True)
+    headers.setdefault("Cache-Control", cachecontrol)
+
+
+class ConditionalRequestMiddleware:
+    def __init__(self, app: ASGIApp, cachecontrol: Dict[str, str], key_prefix: str, ttl: int):
+        self.app = app
+        self.cachecontrol = cachecontrol
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        resource = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            resource = resource_type(scope)
+        if resource is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        # responses depending on the user are neither shared with other users nor validated
+        # from the validators of other users' responses
+        private = "authorization" in request_headers
+        cachecontrol = self.cachecontrol[resource]
+        redis = getattr(scope["app"].state, "redis", None)
+        if private:
+            cachecontrol = cachecontrol.replace("public", "private")
+            redis = None
+        # the links of the responses depend on the host
+        validator_key = f"{self.key_prefix}:{CACHE_KEY_VALIDATOR}:{URL(scope=scope)}"
+        generation_key = (
+            f"{self.key_prefix}:{CACHE_KEY_GENERATION}:{resource_generation(scope, resource)}"
+        )
+        validator, generation = await self._get_validator(redis, validator_key, generation_key)
+        if validator and not_modified(
+            request_headers, validator["etag"], validator["last_modified"]
+        ):
+            await self._not_modified(scope, receive, send, cachecontrol, validator)
+            return
+
+        start_message: Message = {}
+        body: List[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+            # only complete responses are validated
+            if start_message["status"] != 200:
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message["type"] == "http.response.start" or message.get("more_body", False):
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            etag = headers.get("etag") or (
+                f'W/"{hashlib.sha1(b"".join(body), usedforsecurity=False).hexdigest()}"'
+            )
+            last_modified = await self._set_validator(
+                redis, validator_key, etag, validator, generation
+            )
+            current = {"etag": etag, "last_modified": last_modified}
+            if not_modified(request_headers, etag, last_modified):
+                await self._not_modified(scope, receive, send, cachecontrol, current)
+                return
+
+            set_validator_headers(headers, cachecontrol, current)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": b"".join(body)})
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _get_validator(
+        self, redis: Any, validator_key: str, generation_key: str
+    ) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Validator of the response, if still valid, and the current generation."""
+        if redis is None:
+            return None, 0
+        try:
+            with timed("cache"), child_span("redis.mget", {"cache.key": validator_key}):
+                if hasattr(redis, "mget_nonatomic"):
+                    cached, generation = await redis.mget_nonatomic([validator_key, generation_key])
+                else:
+                    cached, generation = await redis.mget([validator_key, generation_key])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Don't fail on redis failure
+            logger.error("GET validator: %s", e)
+            return None, 0
+
+        generation = int(generation or 0)
+        validator = orjson.loads(cached) if cached else None  # pylint: disable=no-member
+        if validator and validator["generation"] != generation:
+            validator = None
+        return validator, generation
+
+    async def _set_validator(
+        self,
+        redis: Any,
+        validator_key: str,
+        etag: str,
+        validator: Optional[Dict[str, Any]],
+        generation: int,
+    ) -> Optional[float]:
+        """Store the validator of the response, return its last modification time."""
+        if redis is None:
+            return None
+        if validator and validator["etag"] == etag:
+            return validator["last_modified"]
+
+        last_modified = time.time()
+        try:
+            with timed("cache"), child_span("redis.set", {"cache.key": validator_key}):
+                await redis.set(
+                    validator_key,
+                    orjson.dumps(  # pylint: disable=no-member
+                        {"etag": etag, "last_modified": last_modified, "generation": generation}
+                    ),
+                    self.ttl,
+                )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Don't fail on redis failure
+            logger.error("SET validator: %s", e)
+        return last_modified
+
+    async def _not_modified(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        cachecontrol: str,
+        validator: Dict[str, Any],
+    ) -> None:
+        response = Response(status_code=304)
+        set_validator_headers(response.headers, cachecontrol, validator)
+        # the validator is shared by the compressed encodings of the response
+        response.headers.add_vary_header("Accept-Encoding")
+        await response(scope, receive, send)
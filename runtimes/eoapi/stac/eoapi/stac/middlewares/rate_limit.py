@@ -0,0 +1,199 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+"""
+Rate limiting middleware.
+
+- Each request entity (the subject of the verified token of authenticated requests, the client IP
+  otherwise) gets a token bucket of `burst` requests refilled at `rate` requests per second, shared
+  between the instances in Redis if enabled, in memory otherwise. CORS preflight requests are not
+  counted.
+- When the database pool is saturated, requests are shed once `max_in_flight` requests are
+  already processed by the instance.
+
+Rejected requests get a 429 response with a `Retry-After` header.
+"""
+
+import logging
+import math
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import attr
+from eoapi.auth_utils import OpenIdConnectAuth
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from eoapi.stac.auth import get_token_payload
+from eoapi.stac.constants import HTTP_429_TOO_MANY_REQUESTS
+from eoapi.stac.utils import get_request_ip
+
+logger = logging.getLogger(__name__)
+
+# Token bucket: refill the bucket since the last request, then take a token if any.
+# Returns whether the request is allowed and the tokens left (as string, Lua numbers are
+# truncated to integers in replies).
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+# maximum number of request entities with an in-memory token bucket
+MAX_LOCAL_BUCKETS = 10000
+
+
+@attr.s
+class RateLimitStats:
+    """Requests allowed, rate limited and shed by the instance."""
+
+    counts: Counter = attr.ib(factory=Counter)
+    in_flight: int = attr.ib(default=0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters."""
+        return {
+            "allowed": self.counts["allowed"],
+            "rate_limited": self.counts["rate_limited"],
+            "shed": self.counts["shed"],
+            "in_flight": self.in_flight,
+        }
+
+
+rate_limit_stats = RateLimitStats()
+
+
+def is_pool_saturated(scope: Scope) -> bool:
+    """Whether all the connections of the database read pool are in use."""
+    pool = getattr(scope["app"].state, "readpool", None)
+    if pool is None:
+        return False
+    return pool.get_size() >= pool.get_max_size() and pool.get_idle_size() == 0
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate: Optional[float],
+        burst: int,
+        max_in_flight: Optional[int],
+        key_prefix: str,
+        oidc_auth: Optional[OpenIdConnectAuth] = None,
+    ):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.key_prefix = key_prefix
+        self.oidc_auth = oidc_auth
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self._script: Any = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or "/_mgmt/" in scope["path"]
+            or scope["path"].endswith("/metrics")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if (
+            self.max_in_flight is not None
+            and rate_limit_stats.in_flight >= self.max_in_flight
+            and is_pool_saturated(scope)
+        ):
+            rate_limit_stats.counts["shed"] += 1
+            await self._reject(scope, receive, send, retry_after=1)
+            return
+
+        if self.rate:
+            entity = await self._request_entity(Request(scope))
+            allowed, tokens = await self._take_token(scope, entity)
+            if not allowed:
+                rate_limit_stats.counts["rate_limited"] += 1
+                logger.info("Rate limited request entity %s", entity)
+                await self._reject(
+                    scope, receive, send, retry_after=math.ceil((1 - tokens) / self.rate)
+                )
+                return
+
+        rate_limit_stats.counts["allowed"] += 1
+        rate_limit_stats.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rate_limit_stats.in_flight -= 1
+
+    async def _request_entity(self, request: Request) -> str:
+        """
+        Subject of the token of an authenticated request, client IP otherwise: unlike the
+        `X-Request-Entity` header, neither can be chosen by the client.
+        """
+        if self.oidc_auth is not None and "Authorization" in request.headers:
+            try:
+                # the signing keys may be fetched from the identity provider
+                payload = await run_in_threadpool(get_token_payload, request, self.oidc_auth)
+                if payload and payload.get("sub"):
+                    return f"sub:{payload['sub']}"
+            except HTTPException:
+                # rejected by the authentication of the endpoint
+                pass
+        client_ip = get_request_ip(request) or (request.client.host if request.client else "")
+        return f"ip:{client_ip}"
+
+    async def _take_token(self, scope: Scope, entity: str) -> Tuple[bool, float]:
+        """Take a token from the bucket of the entity."""
+        redis = getattr(scope["app"].state, "redis", None)
+        if redis is not None:
+            try:
+                if self._script is None:
+                    self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+                allowed, tokens = await self._script(
+                    keys=[f"{self.key_prefix}:rate-limit:{entity}"],
+                    args=[self.rate, self.burst, time.time()],
+                )
+                return bool(allowed), float(tokens)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Don't fail on redis failure, fall back to the local bucket
+                logger.error("Rate limit: %s", e)
+
+        return self._take_local_token(entity)
+
+    def _take_local_token(self, entity: str) -> Tuple[bool, float]:
+        """Take a token from the in-memory bucket of the entity."""
+        now = time.monotonic()
+        tokens, ts = self._buckets.pop(entity, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - ts) * self.rate)  # type: ignore[operator]
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[entity] = (tokens, now)
+        if len(self._buckets) > MAX_LOCAL_BUCKETS:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, retry_after: int) -> None:
+        response = PlainTextResponse(
+            "Too many requests, please try again later.",
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(max(retry_after, 1))},
+        )
+        await response(scope, receive, send)
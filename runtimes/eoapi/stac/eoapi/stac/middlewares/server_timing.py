@@ -0,0 +1,100 @@
+# Copyright 2025, CS GROUP - France, https://www.csgroup.eu/
+"""
+Server-Timing middleware.
+
+The durations of the steps of a request (token verification, cache lookups, database queries,
+link building, response encoding) are summed by step in a collector held by a context variable,
+like the request deadline, and returned in the `Server-Timing` header of the response along with
+the total time to the response:
+
+    Server-Timing: cache;dur=1.3, db-wait;dur=0.1, db;dur=24.8, encode;dur=2.0, total;dur=31.2
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from eoapi.stac.middlewares.tracing import child_span
+
+
+class ServerTiming:
+    """Durations of the steps of a request, by step."""
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add the duration of a step."""
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        """Value of the `Server-Timing` header, durations in milliseconds."""
+        metrics = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.durations.items()]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+# timing of the current request, None out of a request or if Server-Timing is disabled
+server_timing: ContextVar[Optional[ServerTiming]] = ContextVar("server_timing", default=None)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add the duration of a step to the timing of the current request, if collected."""
+    timing = server_timing.get()
+    if timing is not None:
+        timing.record(name, seconds)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Measure a step of the current request, if its timing is collected."""
+    timing = server_timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.record(name, time.perf_counter() - start)
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """JSON response recording its encoding time."""
+
+    def render(self, content: Any) -> bytes:
+        with timed("encode"), child_span("response.encode") as span:
+            body = super().render(content)
+            if span:
+                span.set_attribute("response.size", len(body))
+            return body
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.header(time.perf_counter() - start))
+            await send(message)
+
+        token = server_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            server_timing.reset(token)
@@ -6,9 +6,11 @@ timeout middleware from https://github.com/microsoft/planetary-computer-apis/blo
 import asyncio
 import logging
 import time
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
+from asyncpg.exceptions import QueryCanceledError
 from fastapi.applications import FastAPI
 from fastapi.dependencies.models import Dependant
 from fastapi.dependencies.utils import (
@@ -22,6 +24,17 @@ from starlette.status import HTTP_504_GATEWAY_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+# monotonic time at which the current request times out
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request times out, None out of a request with timeout."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
 
 def with_timeout(
     timeout_seconds: float,
@@ -33,9 +46,11 @@ def with_timeout(
             @wraps(func)
             async def inner(*args: Any, **kwargs: Any) -> Any:
                 start_time = time.monotonic()
+                token = request_deadline.set(start_time + timeout_seconds)
                 try:
                     return await asyncio.wait_for(func(*args, **kwargs), timeout=timeout_seconds)
-                except asyncio.TimeoutError as e:
+                # queries are cancelled by postgres once the request times out
+                except (asyncio.TimeoutError, QueryCanceledError) as e:
                     process_time = time.monotonic() - start_time
                     # don't have a request object here to get custom dimensions.
                     log_dimensions = {
@@ -50,6 +65,8 @@ def with_timeout(
                         "The request exceeded the maximum allowed time, please try again.",
                         status_code=HTTP_504_GATEWAY_TIMEOUT,
                     )
+                finally:
+                    request_deadline.reset(token)
 
             return inner
         else:
@@ -77,7 +94,9 @@ def add_timeout(app: FastAPI, timeout_seconds: float) -> None:
             else:
                 flat_dependant = route.dependant
             route.body_field = (
-                get_body_field(flat_dependant=flat_dependant, name=route.unique_id, embed_body_fields=True)
+                get_body_field(
+                    flat_dependant=flat_dependant, name=route.unique_id, embed_body_fields=True
+                )
                 or route.body_field
             )
             route.app = request_response(route.get_route_handler())
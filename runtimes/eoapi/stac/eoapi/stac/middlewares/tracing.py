@@ -3,30 +3,50 @@
 tracing middleware adapted from https://github.com/microsoft/planetary-computer-apis/blob/main/pccommon/pccommon/tracing.py.
 """
 
-import json
 import logging
-import re
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
-
-import fastapi
-from fastapi import Request
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.trace import SpanKind, get_current_span, get_tracer
-from starlette.datastructures import QueryParams
-from starlette.types import ASGIApp, Receive, Scope, Send
-
-from eoapi.stac.constants import HTTP_METHOD, HTTP_PATH, HTTP_URL
-from eoapi.stac.utils import get_request_ip, request_to_path
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode, get_current_span, get_tracer
+from opentelemetry.util.types import Attributes
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from eoapi.stac.constants import (
+    HTTP_METHOD,
+    HTTP_PATH,
+    HTTP_ROUTE,
+    HTTP_STATUS_CODE,
+    HTTP_URL,
+    X_FORWARDED_FOR,
+    X_ORIGINAL_FORWARDED_FOR,
+)
 
 logger = logging.getLogger(__name__)
 
+tracer = get_tracer(__name__)
+
+# request headers giving the client IP, by precedence
+IP_HEADERS = (X_ORIGINAL_FORWARDED_FOR.lower().encode(), X_FORWARDED_FOR.lower().encode())
+# request headers of the W3C trace context of the caller
+TRACE_CONTEXT_HEADERS = (b"traceparent", b"tracestate")
+
 
 def init_tracing(service_name: str) -> None:
-    """Initialize tracing provider."""
+    """
+    Initialize tracing provider.
+    The sampler is configured by `OTEL_TRACES_SAMPLER` and `OTEL_TRACES_SAMPLER_ARG`, e.g.
+    `parentbased_traceidratio` and `0.1` to trace a tenth of the requests.
+    """
+    # the SDK and the exporter are only loaded with tracing enabled, the spans of the application
+    # are no-ops otherwise
+    # pylint: disable=import-outside-toplevel
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
     resource = Resource(attributes={SERVICE_NAME: service_name})
     tracer_provider = TracerProvider(resource=resource)
     otlp_exporter = OTLPSpanExporter()
@@ -37,82 +57,105 @@ def init_tracing(service_name: str) -> None:
     logger.info(f"Exporting telemetry traces to {otlp_exporter._endpoint} as {service_name}.")
 
 
+@contextmanager
+def child_span(name: str, attributes: Optional[Attributes] = None) -> Iterator[Optional[Span]]:
+    """
+    Span of a step of the request, child of the current span. Out of a traced request, or of a
+    request left out by the sampler, nothing is recorded and None is returned.
+    """
+    if not get_current_span().is_recording():
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def untraced() -> None:
+    """Leave the trace of the current request, in background tasks outliving it."""
+    context.attach(context.Context())
+
+
 class TraceMiddleware:
     def __init__(self, app: ASGIApp, service_name: str):
         self.app = app
         init_tracing(service_name)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if scope["type"] == "http":
-            request: Request = Request(scope, receive)
-            await trace_request(request)
-
-        await self.app(scope, receive, send)
-
-
-async def trace_request(
-    request: Request,
-) -> None:
-    """Construct a request trace with custom dimensions"""
-    request_path = request_to_path(request).strip("/")
-
-    if not _should_trace_request(request):
-        return None
-
-    tracer = get_tracer(__name__)
-    with tracer.start_as_current_span("main") as span:
-        (collection_id, item_id) = await _collection_item_from_request(request)
-        span.span_kind = SpanKind.SERVER
-
-        # Throwing the main span into request state lets us create child spans
-        # in downstream request processing, if there are specific things that
-        # are slow.
-        request.state.parent_span = span
-
-        # Add request dimensions to the trace prior to calling the next middleware
-        span.set_attribute("request_ip", get_request_ip(request))
-        span.set_attribute(HTTP_METHOD, str(request.method))
-        span.set_attribute(HTTP_URL, str(request.url))
-        span.set_attribute(HTTP_PATH, request_path)
-        span.set_attribute("in-server", "true")
-        if collection_id is not None:
-            span.set_attribute("collection", collection_id)
-            if item_id is not None:
-                span.set_attribute("item", item_id)
-
-
-collection_id_re = re.compile(
-    r".*/collections/?(?P<collection_id>[a-zA-Z0-9\-\%]+)?(/items/(?P<item_id>.*))?.*"  # noqa
-)
-
-
-async def _collection_item_from_request(request: Request) -> Tuple[Optional[str], Optional[str]]:
-    """Attempt to get collection and item ids from the request path or querystring."""
-    url = request.url
-    try:
-        collection_id_match = collection_id_re.match(f"{url}")
-        if collection_id_match:
-            collection_id = cast(Optional[str], collection_id_match.group("collection_id"))
-            item_id = cast(Optional[str], collection_id_match.group("item_id"))
-            return (collection_id, item_id)
-        else:
-            collection_id = request.query_params.get("collection")
-            # Some endpoints, like preview/, take an `items` parameter, but
-            # conventionally it is a single item id
-            item_id = request.query_params.get("item") or request.query_params.get("items")
-            return (collection_id, item_id)
-    except Exception as e:
-        logger.exception(e)
-        return (None, None)
-
-
-def _should_trace_request(request: Request) -> bool:
+        if scope["type"] != "http" or not _should_trace_request(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # the main span covers the whole request: the spans of its steps are its children. It
+        # continues the trace of the caller, whose sampling decision the parent based samplers
+        # follow
+        with tracer.start_as_current_span(
+            "main", context=_caller_context(scope), kind=SpanKind.SERVER
+        ) as span:
+            # requests left out by the sampler only propagate the trace context
+            if not span.is_recording():
+                await self.app(scope, receive, send)
+                return
+
+            trace_request(scope, span)
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    trace_response(scope, span, message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def trace_request(scope: Scope, span: Span) -> None:
+    """Add the request dimensions to its span"""
+    url = URL(scope=scope)
+    span.set_attribute("request_ip", _request_ip(scope))
+    span.set_attribute(HTTP_METHOD, scope["method"])
+    span.set_attribute(HTTP_URL, str(url))
+    span.set_attribute(HTTP_PATH, url.path.strip("/"))
+    span.set_attribute("in-server", "true")
+
+
+def trace_response(scope: Scope, span: Span, status_code: int) -> None:
+    """Add the route of the request, known once routed, and the response status to its span"""
+    if route := scope.get("route"):
+        span.set_attribute(HTTP_ROUTE, route.path)
+    path_params: Dict[str, Any] = scope.get("path_params", {})
+    if (collection_id := path_params.get("collection_id")) is not None:
+        span.set_attribute("collection", collection_id)
+        if (item_id := path_params.get("item_id")) is not None:
+            span.set_attribute("item", item_id)
+
+    span.set_attribute(HTTP_STATUS_CODE, status_code)
+    if status_code >= 500:
+        span.set_status(Status(StatusCode.ERROR))
+
+
+def _caller_context(scope: Scope) -> Optional[context.Context]:
+    """Trace context of the caller, from the W3C trace context headers of the request."""
+    carrier = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in scope["headers"]
+        if name in TRACE_CONTEXT_HEADERS
+    }
+    return propagate.extract(carrier) if carrier else None
+
+
+def _request_ip(scope: Scope) -> str:
+    """IP address of the client, from the headers set by the proxies."""
+    headers = dict(scope["headers"])
+    ip_header = next((headers[name] for name in IP_HEADERS if headers.get(name)), b"")
+    # If multiple IPs, take the last one
+    return ip_header.decode("latin-1").split(",")[-1]
+
+
+def _should_trace_request(scope: Scope) -> bool:
     """
     Determine if we should trace a request.
         - Not a HEAD request
         - Not a health check endpoint
     """
-    return request.method.lower() != "head" and not request.url.path.strip("/").endswith("_mgmt/ping")
+    return scope["method"] != "HEAD" and not scope["path"].rstrip("/").endswith("_mgmt/ping")
 
 
 def _parse_cqljson(cql: dict) -> Tuple[Optional[str], Optional[str]]:
@@ -179,45 +222,28 @@ def _iter_cql(cql: Optional[Dict[str, Any]], property_name: str) -> Optional[Uni
     return None
 
 
-def add_stac_attributes_from_search(search_json: str, request: fastapi.Request) -> None:
+def add_stac_attributes_from_search(
+    collections: Optional[Sequence[str]] = None,
+    ids: Optional[Sequence[str]] = None,
+    cql_filter: Optional[Dict[str, Any]] = None,
+) -> None:
     """
     Try to add the Collection ID and Item ID from a search to the current span.
+    The collection and item may be either in the `collections` and `ids` of the search or in its
+    CQL-JSON or CQL2-JSON filter.
     """
-    collection_id, item_id = parse_collection_from_search(json.loads(search_json), request.method, request.query_params)
-    parent_span = getattr(request.state, "parent_span", None)
-
-    current_span = get_current_span() or parent_span
-
-    if current_span:
-        if collection_id is not None:
-            current_span.add_attribute("collection", collection_id)
-            if item_id is not None:
-                current_span.add_attribute("item", item_id)
+    current_span = get_current_span()
+    if not current_span.is_recording():
+        return
+
+    if collections is not None or ids is not None:
+        collection_id, item_id = _parse_queryjson({"collections": collections, "ids": ids})
+    elif cql_filter:
+        collection_id, item_id = _parse_cqljson(cql_filter)
     else:
-        logger.warning("No active or parent span available for adding attributes.")
+        return
 
-
-def parse_collection_from_search(
-    body: Dict[str, Any],
-    method: str,
-    query_params: QueryParams,
-) -> Tuple[Optional[str], Optional[str]]:
-    """
-    Parse the collection id from a search request.
-    The search endpoint is a bit of a special case. If it's a GET, the collection
-    and item ids are in the querystring. If it's a POST, the collection and item may
-    be in either a CQL-JSON or CQL2-JSON filter body, or a query/stac-ql body.
-    """
-    if method.lower() == "get":
-        collection_id = query_params.get("collections")
-        item_id = query_params.get("ids")
-        return (collection_id, item_id)
-    elif method.lower() == "post":
-        try:
-            if body.get("collections") is not None:
-                return _parse_queryjson(body)
-            elif "filter" in body:
-                return _parse_cqljson(body["filter"])
-        except json.JSONDecodeError as e:
-            logger.warning(f"Unable to parse search body as JSON. Ignoring collectionparameter. {e}")
-    return (None, None)
+    if collection_id is not None:
+        current_span.set_attribute("collection", collection_id)
+        if item_id is not None:
+            current_span.set_attribute("item", item_id)
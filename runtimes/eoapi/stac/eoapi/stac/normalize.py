@@ -0,0 +1,272 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Search normalization.
+
+Rewrite searches into a canonical form before generating their cache key and running them, so
+that semantically identical searches share the same cache entry.
+
+With SEARCH_BBOX_PRECISION, close item searches can also share a cache entry by running the
+search over a bbox rounded outward, then dropping the features whose geometry is out of the bbox of
+each client from the shared result. This changes the results: pages may hold less features than the
+limit, or none while still linking to the next page, and the matched count is left out.
+"""
+
+import hashlib
+import math
+from datetime import timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import orjson
+from fastapi import HTTPException
+from stac_fastapi.pgstac.types.search import PgstacSearch
+from stac_fastapi.types.rfc3339 import datetime_to_str, str_to_interval
+from stac_fastapi.types.stac import ItemCollection
+
+from eoapi.stac.config import Settings
+
+DEFAULT_LIMIT = 10
+
+
+def normalize_bbox(bbox: Sequence[float], precision: Optional[int]) -> Tuple[float, ...]:
+    """
+    Write the bbox coordinates as floats, quantized to the given number of decimals if any.
+    Coordinates are rounded outward so that the quantized bbox contains the original one.
+    """
+    if precision is None:
+        return tuple(float(v) for v in bbox)
+
+    factor = 10**precision
+    half = len(bbox) // 2
+    return tuple(
+        (math.floor(v * factor) if i < half else math.ceil(v * factor)) / factor
+        for i, v in enumerate(bbox)
+    )
+
+
+def normalize_datetime(value: str) -> str:
+    """Write a datetime or an interval in UTC with open ends as `..`."""
+    try:
+        interval = str_to_interval(value)
+    except HTTPException:
+        # left to the validation of the search
+        return value
+
+    if interval is None:
+        return value
+    if not isinstance(interval, tuple):
+        return datetime_to_str(interval.astimezone(timezone.utc))
+    return "/".join(datetime_to_str(dt.astimezone(timezone.utc)) if dt else ".." for dt in interval)
+
+
+def normalize_search(search_request: PgstacSearch) -> PgstacSearch:
+    """Rewrite an item search in place into its canonical form."""
+    if search_request.collections:
+        search_request.collections = sorted(set(search_request.collections))
+    if search_request.ids:
+        search_request.ids = sorted(set(search_request.ids))
+    if search_request.bbox:
+        search_request.bbox = normalize_bbox(search_request.bbox, None)  # type: ignore[assignment]
+    if search_request.datetime:
+        search_request.datetime = normalize_datetime(search_request.datetime)
+    if not search_request.limit:
+        search_request.limit = DEFAULT_LIMIT
+    return search_request
+
+
+def normalize_collection_search(clean_args: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite the arguments of a collection search into their canonical form."""
+    if ids := clean_args.get("ids"):
+        clean_args["ids"] = sorted(set(ids))
+    if bbox := clean_args.get("bbox"):
+        clean_args["bbox"] = normalize_bbox(bbox, None)
+    if datetime := clean_args.get("datetime"):
+        clean_args["datetime"] = normalize_datetime(datetime)
+    if fields := clean_args.get("fields"):
+        clean_args["fields"] = {key: sorted(value) for key, value in fields.items()}
+    if not clean_args.get("limit"):
+        clean_args["limit"] = DEFAULT_LIMIT
+    if clean_args.get("offset") == 0:
+        clean_args.pop("offset")
+    return clean_args
+
+
+def quantize_search(search_request: PgstacSearch, settings: Settings) -> Optional[PgstacSearch]:
+    """
+    Copy of an item search with its bbox rounded outward, to run and cache in place of the
+    searches rounded to the same bbox. None without cache, if the rounding doesn't change the
+    bbox, if it crosses the antimeridian, or if the fields extension may drop the bbox of the
+    features.
+    """
+    bbox = search_request.bbox
+    if not bbox or settings.search_bbox_precision is None or not settings.redis_enabled:
+        return None
+    fields = getattr(search_request, "fields", None)
+    if fields and (fields.include or fields.exclude):
+        return None
+    half = len(bbox) // 2
+    if bbox[0] > bbox[half]:
+        return None
+
+    rounded = normalize_bbox(bbox, settings.search_bbox_precision)
+    if rounded == tuple(bbox):
+        return None
+    return search_request.model_copy(update={"bbox": rounded}, deep=True)
+
+
+def _intersects(bbox: Sequence[float], other: Sequence[float]) -> bool:
+    """Whether two 2D or 3D bboxes intersect in 2D, `other` possibly crossing the antimeridian."""
+    half, other_half = len(bbox) // 2, len(other) // 2
+    if other[1] > bbox[half + 1] or other[other_half + 1] < bbox[1]:
+        return False
+    if other[0] > other[other_half]:
+        return True
+    return other[0] <= bbox[half] and other[other_half] >= bbox[0]
+
+
+Rectangle = Tuple[float, float, float, float]
+
+
+def _segment_intersects(p: Sequence[float], q: Sequence[float], rect: Rectangle) -> bool:
+    """Whether the segment from p to q intersects the rectangle (Liang-Barsky clipping)."""
+    minx, miny, maxx, maxy = rect
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    t0, t1 = 0.0, 1.0
+    for pk, qk in ((-dx, p[0] - minx), (dx, maxx - p[0]), (-dy, p[1] - miny), (dy, maxy - p[1])):
+        if pk == 0:
+            if qk < 0:
+                return False
+            continue
+        t = qk / pk
+        if pk < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return False
+    return True
+
+
+def _polygon_contains(rings: List[Any], x: float, y: float) -> bool:
+    """Whether the polygon, holes excluded, contains the point (even-odd rule)."""
+    inside = False
+    for ring in rings:
+        for (x1, y1, *_), (x2, y2, *_) in zip(ring, ring[1:]):
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+    return inside
+
+
+def _geometry_intersects(geometry: Dict[str, Any], rect: Rectangle) -> bool:
+    """Whether a GeoJSON geometry intersects the rectangle."""
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        return any(_geometry_intersects(g, rect) for g in geometry.get("geometries") or [])
+
+    coordinates = geometry.get("coordinates") or []
+    if geometry_type == "Point":
+        return _segment_intersects(coordinates, coordinates, rect)
+    if geometry_type == "MultiPoint":
+        return any(_segment_intersects(p, p, rect) for p in coordinates)
+    if geometry_type in ("LineString", "MultiLineString"):
+        lines = [coordinates] if geometry_type == "LineString" else coordinates
+        return any(
+            _segment_intersects(p, q, rect) for line in lines for p, q in zip(line, line[1:])
+        )
+    if geometry_type in ("Polygon", "MultiPolygon"):
+        polygons = [coordinates] if geometry_type == "Polygon" else coordinates
+        return any(
+            # an edge crosses the rectangle, or the rectangle is within the polygon
+            any(_segment_intersects(p, q, rect) for ring in rings for p, q in zip(ring, ring[1:]))
+            or _polygon_contains(rings, rect[0], rect[1])
+            for rings in polygons
+        )
+    return True
+
+
+def _feature_intersects(feature: Dict[str, Any], bbox: Sequence[float]) -> bool:
+    """Whether the geometry of a feature intersects the bbox, its own bbox being checked first."""
+    if "bbox" in feature and not _intersects(bbox, feature["bbox"]):
+        return False
+    geometry = feature.get("geometry")
+    if not geometry:
+        return True
+    half = len(bbox) // 2
+    return _geometry_intersects(geometry, (bbox[0], bbox[1], bbox[half], bbox[half + 1]))
+
+
+def _with_bbox(link: Dict[str, Any], bbox: Sequence[float]) -> Dict[str, Any]:
+    """Paging link with its bbox parameter replaced, the other parameters being kept as is."""
+    link = dict(link)
+    if isinstance(link.get("body"), dict):
+        link["body"] = {**link["body"], "bbox": list(bbox)}
+    elif "href" in link:
+        url = urlsplit(link["href"])
+        query = parse_qsl(url.query, keep_blank_values=True)
+        if any(key == "bbox" for key, _ in query):
+            value = ",".join(str(v) for v in bbox)
+            query = [(key, value if key == "bbox" else v) for key, v in query]
+            link["href"] = urlunsplit(url._replace(query=urlencode(query, safe=",:")))
+    return link
+
+
+def clip_search_result(item_collection: ItemCollection, bbox: Sequence[float]) -> ItemCollection:
+    """
+    Result of an item search over a rounded bbox, restricted to the features whose geometry
+    intersects the bbox of the client. The page may hold less features than the limit, and the
+    number of matched features of the rounded bbox is dropped.
+    """
+    features = [
+        feature
+        for feature in item_collection.get("features") or []
+        if _feature_intersects(feature, bbox)
+    ]
+    result: Dict[str, Any] = {
+        key: value
+        for key, value in item_collection.items()
+        if key not in ("features", "numberMatched", "context")
+    }
+    result["features"] = features
+    if "numberReturned" in item_collection:
+        result["numberReturned"] = len(features)
+    if "links" in item_collection:
+        result["links"] = [_with_bbox(link, bbox) for link in item_collection["links"]]
+    return ItemCollection(**result)  # type: ignore[typeddict-item]
+
+
+def _default(obj: Any) -> Any:
+    """Serialize sets (e.g. fields include/exclude) in a stable order."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError
+
+
+def search_cache_key(prefix: str, search: Any) -> str:
+    """
+    Cache key of a search, from a digest of its canonical JSON representation.
+    Unlike `hash()`, the digest is the same across processes.
+    """
+    if isinstance(search, PgstacSearch):
+        search = search.model_dump(exclude_none=True, by_alias=True)
+    search_json = orjson.dumps(  # pylint: disable=no-member
+        search,
+        default=_default,
+        option=orjson.OPT_SORT_KEYS,  # pylint: disable=no-member
+    )
+    return f"{prefix}:{hashlib.sha256(search_json).hexdigest()}"
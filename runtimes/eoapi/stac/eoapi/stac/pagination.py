@@ -0,0 +1,122 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Token pagination of collection searches.
+
+Tokens are opaque to clients. Searches sorted by id only are paginated by keyset: the next token
+holds the id of the last collection of the page, and the next page is filtered on the ids after it,
+so that its cost doesn't depend on its position. The previous token holds the id of the first
+collection, the previous page is read backward from it. Other sort orders fall back to an offset
+held in the token.
+"""
+
+import base64
+import binascii
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi import HTTPException
+from starlette import status
+
+
+def encode_token(page: Dict[str, Any]) -> str:
+    """Encode the position of a page into a token."""
+    return base64.urlsafe_b64encode(orjson.dumps(page)).decode().rstrip("=")  # pylint: disable=no-member
+
+
+def _valid_page(page: Any) -> bool:
+    """Whether the decoded position holds an id to seek from or a non-negative offset."""
+    if not isinstance(page, dict):
+        return False
+    if any(key in page and not isinstance(page[key], str) for key in ("after", "before")):
+        return False
+    offset = page.get("offset", 0)
+    return isinstance(offset, int) and not isinstance(offset, bool) and offset >= 0
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Decode the position of a page from a token.
+    Raises:
+        HTTPException if the token is invalid
+    """
+    try:
+        page = orjson.loads(  # pylint: disable=no-member
+            base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        )
+    except (binascii.Error, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination token",
+        ) from e
+    if not _valid_page(page):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination token",
+        )
+    return page
+
+
+def keyset_direction(sortby: Optional[List[Dict[str, str]]]) -> Optional[str]:
+    """
+    Direction of the collection search if it can be paginated by keyset, i.e. if it is sorted by
+    id only (pgstac default order is ascending ids), None otherwise.
+    """
+    if not sortby:
+        return "asc"
+    if len(sortby) == 1 and sortby[0]["field"] == "id":
+        return sortby[0].get("direction", "asc")
+    return None
+
+
+def keyset_search(
+    clean_args: Dict[str, Any],
+    direction: str,
+    after: Optional[str],
+    before: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Arguments of a collection search for the page after the collection id `after`, or before the
+    collection id `before` in reverse order, with one extra collection to know if there is a page
+    further.
+    """
+    search = {**clean_args, "limit": clean_args["limit"] + 1}
+    search.pop("offset", None)
+
+    if fields := search.get("fields"):
+        # the ids of the first and last collections are needed for the tokens, and kept as
+        # required by the response model, like the ids of items
+        include, exclude = fields.get("include"), fields.get("exclude")
+        search["fields"] = {
+            **fields,
+            **({"include": sorted({*include, "id"})} if include else {}),
+            **({"exclude": sorted(set(exclude) - {"id"})} if exclude else {}),
+        }
+
+    condition = None
+    if after is not None:
+        condition = {"op": ">" if direction == "asc" else "<", "args": [{"property": "id"}, after]}
+    elif before is not None:
+        condition = {"op": "<" if direction == "asc" else ">", "args": [{"property": "id"}, before]}
+        search["sortby"] = [{"field": "id", "direction": "desc" if direction == "asc" else "asc"}]
+
+    if condition:
+        if existing := search.get("filter"):
+            condition = {"op": "and", "args": [existing, condition]}
+        search["filter"] = condition
+    return search
@@ -0,0 +1,81 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Speculative prefetch of search pages."""
+
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Dict, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+from eoapi.stac.middlewares.server_timing import server_timing
+from eoapi.stac.middlewares.timeout import request_deadline
+from eoapi.stac.middlewares.tracing import untraced
+
+logger = logging.getLogger(__name__)
+
+
+def next_token(item_collection: Dict[str, Any]) -> Optional[str]:
+    """Return the pagination token of the `next` link of a search result, if any."""
+    for link in item_collection.get("links") or []:
+        if link.get("rel") != "next":
+            continue
+        if body := link.get("body"):
+            return body.get("token")
+        return parse_qs(urlparse(link["href"]).query).get("token", [None])[0]
+    return None
+
+
+class SearchPrefetcher:
+    """
+    Run prefetches in background tasks, at most `concurrency` at once.
+    Prefetches are dropped rather than queued when the limit is reached, as a late prefetch is
+    useless.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, cache_key: str, fn: Callable[[], Coroutine[Any, Any, Any]]) -> bool:
+        """Schedule a prefetch, return False if it was dropped."""
+        if cache_key in self._tasks or len(self._tasks) >= self.concurrency:
+            return False
+
+        task = asyncio.create_task(self._run(cache_key, fn))
+        self._tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(cache_key, None))
+        return True
+
+    async def _run(self, cache_key: str, fn: Callable[[], Coroutine[Any, Any, Any]]) -> None:
+        # the prefetch outlives the request which scheduled it
+        request_deadline.set(None)
+        server_timing.set(None)
+        untraced()
+        try:
+            await fn()
+            logger.debug("Prefetched %s", cache_key)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # a failed prefetch will be run again by the client request
+            logger.warning("Prefetch of %s failed: %s", cache_key, e)
+
+    async def close(self) -> None:
+        """Cancel the pending prefetches."""
+        tasks: Set[asyncio.Task] = set(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,117 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Preload of the most frequent searches.
+
+The item searches are counted in a space-saving sketch: the `capacity` most frequent searches are
+tracked with an approximate count, a new search replacing the least frequent one. Every `interval`
+seconds, the cache entries of the `top` most frequent searches about to expire are refreshed, so
+that the hottest searches are never a cache miss. The counts are halved every `decay_interval`
+seconds, so that searches which stopped being requested leave the top.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from fastapi import FastAPI
+
+from eoapi.stac.middlewares.timeout import request_deadline
+from eoapi.stac.stats import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+
+class SearchPreloader:
+    """Refresh the cache entries of the most frequent searches before they expire."""
+
+    def __init__(self, top: int, capacity: int, interval: float, decay_interval: float):
+        self.top = top
+        self.interval = interval
+        self.decay_interval = decay_interval
+        self.sketch = SpaceSaving(capacity)
+        self._refreshes: Dict[str, Callable[[], Coroutine[Any, Any, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, cache_key: str, refresh: Callable[[], Coroutine[Any, Any, Any]]) -> None:
+        """Count a search, with the function refreshing its cache entry."""
+        self._refreshes[cache_key] = refresh
+        if evicted := self.sketch.add(cache_key):
+            self._refreshes.pop(evicted, None)
+
+    async def refresh(self, app: FastAPI) -> int:
+        """Refresh the top searches expiring before the next refresh, return their number."""
+        settings = app.state.settings
+        cache_keys = [key for key in self.sketch.top(self.top) if key in self._refreshes]
+        if not cache_keys:
+            return 0
+
+        async with app.state.redis.pipeline(transaction=False) as pipe:
+            for cache_key in cache_keys:
+                pipe.ttl(f"{settings.stac_fastapi_landing_id}:{cache_key}")
+            ttls = await pipe.execute()
+
+        refreshed = 0
+        for cache_key, ttl in zip(cache_keys, ttls):
+            # missing keys have a negative TTL
+            if ttl > 2 * self.interval:
+                continue
+            try:
+                await self._refreshes[cache_key]()
+                refreshed += 1
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Preload of %s failed: %s", cache_key, e)
+        return refreshed
+
+    def decay(self) -> None:
+        """Halve the counts of the searches, forget the ones no longer counted."""
+        self.sketch.decay()
+        self._refreshes = {
+            key: refresh for key, refresh in self._refreshes.items() if key in self.sketch.counts
+        }
+
+    def start(self, app: FastAPI) -> None:
+        """Refresh the top searches periodically."""
+
+        async def _refresh() -> None:
+            from eoapi.stac.redis import refresh_cache  # pylint: disable=import-outside-toplevel
+
+            # preloads are not bound to a client request
+            request_deadline.set(None)
+            refresh_cache.set(True)
+            elapsed = 0.0
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    refreshed = await self.refresh(app)
+                    logger.debug("Preloaded %d searches", refreshed)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Search preload: %s", e)
+
+                elapsed += self.interval
+                if elapsed >= self.decay_interval:
+                    self.decay()
+                    elapsed = 0.0
+
+        self._task = asyncio.create_task(_refresh())
+
+    async def close(self) -> None:
+        """Stop refreshing the top searches."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -0,0 +1,130 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Queryables precomputed for the global endpoint and for each collection.
+
+The queryables of all the collections are computed at once by pgstac and kept in memory. They are
+only computed again when rows of the `collections` or `queryables` tables change, which is detected
+by polling the modification counters of the tables in the statistics of postgres. The counters are
+reported with a delay, so the queryables are also computed again once they reach a maximum age.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import attr
+import orjson
+from fastapi import FastAPI
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+# rows inserted, updated and deleted in the tables the queryables are computed from
+TABLES_VERSION_QUERY = """
+SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0)::bigint
+FROM pg_stat_user_tables
+WHERE schemaname = 'pgstac' AND relname IN ('collections', 'queryables');
+"""
+
+QUERYABLES_QUERY = """
+SELECT
+    get_queryables(NULL::text),
+    (SELECT coalesce(jsonb_object_agg(id, get_queryables(id)), '{}') FROM collections);
+"""
+
+
+@attr.s(frozen=True)
+class PrecomputedQueryables:
+    """
+    Queryables of a collection, or of all the collections, and their digest. The `$id` of the
+    served queryables is left out of the digest, hence a weak ETag.
+    """
+
+    content: Dict[str, Any] = attr.ib()
+    etag: str = attr.ib()
+
+    @classmethod
+    def from_content(cls, content: Dict[str, Any]) -> "PrecomputedQueryables":
+        digest = hashlib.sha1(  # pylint: disable=no-member
+            orjson.dumps(content, option=orjson.OPT_SORT_KEYS),  # pylint: disable=no-member
+            usedforsecurity=False,
+        ).hexdigest()
+        return cls(content=content, etag=f'W/"{digest}"')
+
+
+class QueryablesStore:
+    """Precomputed queryables, refreshed when the collections or the queryables change."""
+
+    def __init__(self, interval: float, max_age: float):
+        self.interval = interval
+        self.max_age = max_age
+        # version of the tables the queryables were computed from, and monotonic time
+        self.version: Optional[int] = None
+        self.computed_at = 0.0
+        self._queryables: Dict[Optional[str], PrecomputedQueryables] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, collection_id: Optional[str]) -> Optional[PrecomputedQueryables]:
+        """Queryables of the collection, or of all the collections if no collection is given."""
+        return self._queryables.get(collection_id)
+
+    async def refresh(self, app: FastAPI) -> None:
+        """
+        Compute the queryables again if the collections or the queryables changed, or if they
+        are older than the maximum age.
+        """
+        request = Request({"type": "http", "app": app})
+        # the statistics of the tables are only maintained by the writer
+        async with app.state.get_connection(request, "w") as conn:
+            version = await conn.fetchval(TABLES_VERSION_QUERY)
+            if version == self.version and time.monotonic() - self.computed_at < self.max_age:
+                return
+            all_queryables, collections_queryables = await conn.fetchrow(QUERYABLES_QUERY)
+
+        queryables = {
+            collection_id: PrecomputedQueryables.from_content(content)
+            for collection_id, content in collections_queryables.items()
+            if content
+        }
+        queryables[None] = PrecomputedQueryables.from_content(all_queryables or {})
+        self._queryables = queryables
+        self.version = version
+        self.computed_at = time.monotonic()
+        logger.info("Precomputed the queryables of %d collections", len(collections_queryables))
+
+    def start(self, app: FastAPI) -> None:
+        """Check for changes of the collections or the queryables periodically."""
+
+        async def _refresh() -> None:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.refresh(app)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Queryables refresh: %s", e)
+
+        self._task = asyncio.create_task(_refresh())
+
+    async def close(self) -> None:
+        """Stop refreshing the queryables."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
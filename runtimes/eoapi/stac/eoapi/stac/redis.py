@@ -9,13 +9,17 @@ from __future__ import annotations
 
 import logging
 import time
+from contextvars import ContextVar
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Coroutine,
     Dict,
+    List,
     Literal,
+    Optional,
+    Sequence,
     TypedDict,
     TypeVar,
     Union,
@@ -27,8 +31,17 @@ from redis.asyncio import Redis as RedisClient  # type: ignore
 from redis.asyncio import RedisCluster
 from stac_fastapi.pgstac.types.base_item_cache import BaseItemCache
 
-from eoapi.stac.constants import CACHE_KEY_BASE_ITEM
+from eoapi.stac.constants import (
+    CACHE_KEY_BASE_ITEM,
+    CACHE_KEY_GENERATION,
+    CACHE_KEY_ITEM,
+    CACHE_KEY_SEARCH_INDEXES,
+    CACHE_KEY_SEARCH_RESULTS,
+)
 from eoapi.stac.logs import get_custom_dimensions  # Assuming you keep using your logging setup
+from eoapi.stac.middlewares.server_timing import record_timing, timed
+from eoapi.stac.middlewares.tracing import child_span
+from eoapi.stac.stats import cache_stats
 
 Redis = Union[RedisCluster, RedisClient]
 
@@ -50,6 +63,10 @@ class RedisParams(TypedDict):
 
 T = TypeVar("T")
 
+# set by the background tasks refreshing cache entries: the cached value is ignored, the result is
+# fetched and cached again with a new TTL
+refresh_cache: ContextVar[bool] = ContextVar("refresh_cache", default=False)
+
 
 async def connect_to_redis(app: FastAPI) -> None:
     """Connect to redis and store instance and script hashes in app state."""
@@ -73,25 +90,54 @@ async def connect_to_redis(app: FastAPI) -> None:
     logger.info("Connected to Redis on %s:%s", settings.redis_hostname, settings.redis_port)
 
 
+def _register_search(
+    pipe: Any, prefix: str, set_key: str, cache_key: str, collections: Sequence[str], ttl: int
+) -> None:
+    """
+    Add the key of a cached search to the sets of its collections, scored by its expiry for the
+    expired keys to be dropped.
+    """
+    now = time.time()
+    keys = [f"{prefix}{set_key}:{collection_id}" for collection_id in collections]
+    for key in keys or [f"{prefix}{set_key}"]:
+        pipe.zadd(key, {cache_key: now + ttl})
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.expire(key, ttl)
+
+
 async def cached_result(
     fn: Callable[..., Coroutine[Any, Any, T]],
     cache_key: str,
     request: Request,
+    collections: Optional[Sequence[str]] = None,
 ) -> T:
-    """Either get the result from redis or run the function and cache the result."""
+    """
+    Either get the result from redis or run the function and cache the result.
+
+    The result of a search is given the searched collections, empty for all of them, so that it
+    is invalidated on the writes of their items.
+    """
     settings: Settings = request.app.state.settings
     r: Redis
 
-    # Add a prefix to the cache key to avoid collisions between different instances
-    cache_key = f"{settings.stac_fastapi_landing_id}:{cache_key}"
+    stats_key = cache_key
+    # Add a prefix to the cache key to avoid collisions between different instances
+    prefix = f"{settings.stac_fastapi_landing_id}:"
+    cache_key = f"{prefix}{cache_key}"
 
     # GET key from cache
     try:
         r = request.app.state.redis
-        if r:
-            ts = time.perf_counter()
-            cached: str = await r.get(cache_key)  # type: ignore
-            te = time.perf_counter()
+        if r and not refresh_cache.get():
+            with child_span("redis.get", {"cache.key": cache_key}) as span:
+                ts = time.perf_counter()
+                cached: str = await r.get(cache_key)  # type: ignore
+                te = time.perf_counter()
+                if span:
+                    span.set_attributes(
+                        {"cache.hit": bool(cached), "cache.size": len(cached or "")}
+                    )
+            record_timing("cache", te - ts)
             if cached:
                 logger.debug(
                     "GET cache: found key",
@@ -103,6 +149,7 @@ async def cached_result(
                         request,
                     ),
                 )
+                cache_stats.record(stats_key, hit=True, seconds=te - ts, size=len(cached))
                 return orjson.loads(cached)  # pylint: disable=no-member
     except Exception as e:  # pylint: disable=broad-exception-caught
         # Don't fail on redis failure
@@ -126,13 +173,271 @@ async def cached_result(
     )
 
     # SET key in cache
+    payload = b""
     try:
         r = request.app.state.redis
-        await r.set(
+        payload = orjson.dumps(result)  # pylint: disable=no-member
+        async with r.pipeline(transaction=False) as pipe:  # type: ignore
+            pipe.set(cache_key, payload, settings.redis_ttl)
+            if collections is not None:
+                _register_search(
+                    pipe,
+                    prefix,
+                    CACHE_KEY_SEARCH_RESULTS,
+                    cache_key,
+                    collections,
+                    settings.redis_ttl,
+                )
+            with timed("cache"), child_span(
+                "redis.set", {"cache.key": cache_key, "cache.size": len(payload)}
+            ):
+                await pipe.execute()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Don't fail on redis failure
+        logger.error(
+            "SET cache: %s",
+            e,
+            extra=get_custom_dimensions({"cache_key": cache_key}, request),
+        )
+        if settings.debug:
+            raise
+
+    cache_stats.record(stats_key, hit=False, seconds=te - ts, size=len(payload))
+    return result
+
+
+async def _mget(r: Redis, keys: List[str], settings: Settings) -> List[Optional[bytes]]:
+    """MGET keys, which may belong to different slots on a cluster."""
+    with timed("cache"), child_span("redis.mget", {"cache.keys": len(keys)}):
+        if settings.redis_cluster:
+            return await r.mget_nonatomic(keys)  # type: ignore
+        return await r.mget(keys)  # type: ignore
+
+
+async def _mset(r: Redis, payloads: Dict[str, bytes], settings: Settings) -> None:
+    """SET keys with the TTL in a single round trip."""
+    async with r.pipeline(transaction=False) as pipe:  # type: ignore
+        for key, payload in payloads.items():
+            pipe.set(key, payload, settings.redis_ttl)
+        with timed("cache"), child_span(
+            "redis.set",
+            {"cache.keys": len(payloads), "cache.size": sum(map(len, payloads.values()))},
+        ):
+            await pipe.execute()
+
+
+async def cached_results(
+    fn: Callable[[List[str]], Coroutine[Any, Any, Dict[str, T]]],
+    cache_keys: List[str],
+    request: Request,
+) -> Dict[str, T]:
+    """
+    Get several results from redis in a single round trip, run the function once for all the
+    missing keys and cache its results with a pipeline.
+    The function receives the missing keys and returns the fetched results by key, keys
+    without result are neither returned nor cached.
+    """
+    settings: Settings = request.app.state.settings
+    r: Redis = request.app.state.redis
+
+    # Add a prefix to the cache keys to avoid collisions between different instances
+    prefix = f"{settings.stac_fastapi_landing_id}:"
+
+    results: Dict[str, T] = {}
+    missing_keys = list(cache_keys)
+
+    # MGET keys from cache
+    try:
+        prefixed_keys = [f"{prefix}{cache_key}" for cache_key in cache_keys]
+        ts = time.perf_counter()
+        cached = await _mget(r, prefixed_keys, settings)
+        te = time.perf_counter()
+
+        missing_keys = []
+        for cache_key, value in zip(cache_keys, cached):
+            if value:
+                results[cache_key] = orjson.loads(value)  # pylint: disable=no-member
+                cache_stats.record(
+                    cache_key, hit=True, seconds=(te - ts) / len(cache_keys), size=len(value)
+                )
+            else:
+                missing_keys.append(cache_key)
+        logger.debug(
+            "MGET cache: found keys",
+            extra=get_custom_dimensions(
+                {
+                    "found": len(results),
+                    "missing": len(missing_keys),
+                    "duration_ms": f"{(te - ts) * 1000:.0f}",
+                },
+                request,
+            ),
+        )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Don't fail on redis failure
+        logger.error(
+            "MGET cache: %s",
+            e,
+            extra=get_custom_dimensions({"cache_keys": len(cache_keys)}, request),
+        )
+        if settings.debug:
+            raise
+
+    if not missing_keys:
+        return results
+
+    ts = time.perf_counter()
+    fetched = await fn(missing_keys)
+    te = time.perf_counter()
+    logger.debug(
+        "perf: cacheable resources fetch time",
+        extra=get_custom_dimensions(
+            {"cache_keys": len(missing_keys), "duration_ms": f"{(te - ts) * 1000:.0f}"},
+            request,
+        ),
+    )
+
+    # SET keys in cache
+    payloads: Dict[str, bytes] = {}
+    try:
+        payloads = {key: orjson.dumps(result) for key, result in fetched.items()}  # pylint: disable=no-member
+        if payloads:
+            await _mset(
+                r, {f"{prefix}{key}": payload for key, payload in payloads.items()}, settings
+            )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Don't fail on redis failure
+        logger.error(
+            "SET cache: %s",
+            e,
+            extra=get_custom_dimensions({"cache_keys": len(fetched)}, request),
+        )
+        if settings.debug:
+            raise
+
+    for cache_key in missing_keys:
+        cache_stats.record(
             cache_key,
-            orjson.dumps(result),  # pylint: disable=no-member
-            settings.redis_ttl,
+            hit=False,
+            seconds=(te - ts) / len(missing_keys),
+            size=len(payloads.get(cache_key, b"")),
+        )
+
+    results.update(fetched)
+    return results
+
+
+async def cached_search(
+    fn: Callable[..., Coroutine[Any, Any, Dict[str, Any]]],
+    cache_key: str,
+    request: Request,
+    collections: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Either assemble the search result from redis or run the search and cache the result.
+
+    The search cache is split in two levels: the search key only references the ordered
+    (collection id, item id) of its features next to the rest of the result (paging links,
+    counts), while the features are stored once under their item cache key, shared by all the
+    searches and `get_item`. A search is a miss as soon as one of its items is not cached,
+    which allows item-level invalidation. The search index is kept in the sets of the searched
+    collections, all of them if empty, to be invalidated when items are added to them.
+    """
+    settings: Settings = request.app.state.settings
+    r: Redis = request.app.state.redis
+
+    stats_key = cache_key
+    prefix = f"{settings.stac_fastapi_landing_id}:"
+    cache_key = f"{prefix}{cache_key}"
+
+    # GET search index and MGET its items from cache
+    try:
+        ts = time.perf_counter()
+        with timed("cache"), child_span("redis.get", {"cache.key": cache_key}) as span:
+            cached: Optional[str] = None if refresh_cache.get() else await r.get(cache_key)  # type: ignore
+            if span:
+                # the items may still miss
+                span.set_attributes({"cache.hit": bool(cached), "cache.size": len(cached or "")})
+        if cached:
+            index = orjson.loads(cached)  # pylint: disable=no-member
+            item_keys = [
+                f"{prefix}{CACHE_KEY_ITEM}:{collection_id}:{item_id}"
+                for collection_id, item_id in index["items"]
+            ]
+            items = await _mget(r, item_keys, settings) if item_keys else []
+            found = [item for item in items if item]
+            te = time.perf_counter()
+
+            if len(found) == len(items):
+                logger.debug(
+                    "GET cache: found search",
+                    extra=get_custom_dimensions(
+                        {
+                            "cache_key": cache_key,
+                            "items": len(item_keys),
+                            "duration_ms": f"{(te - ts) * 1000:.0f}",
+                        },
+                        request,
+                    ),
+                )
+                cache_stats.record(
+                    stats_key,
+                    hit=True,
+                    seconds=te - ts,
+                    size=len(cached) + sum(len(item) for item in found),
+                )
+                return {
+                    **index["search"],
+                    "features": [orjson.loads(item) for item in found],  # pylint: disable=no-member
+                }
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Don't fail on redis failure
+        logger.error(
+            "GET cache: %s",
+            e,
+            extra=get_custom_dimensions({"cache_key": cache_key}, request),
         )
+        if settings.debug:
+            raise
+
+    ts = time.perf_counter()
+    result = await fn()
+    te = time.perf_counter()
+    logger.debug(
+        "perf: cacheable resource fetch time",
+        extra=get_custom_dimensions(
+            {"cache_key": cache_key, "duration_ms": f"{(te - ts) * 1000:.0f}"},
+            request,
+        ),
+    )
+
+    # SET search index and items in cache
+    size = 0
+    try:
+        features = result.get("features") or []
+        index = {
+            "search": {k: v for k, v in result.items() if k != "features"},
+            "items": [[feature["collection"], feature["id"]] for feature in features],
+        }
+        async with r.pipeline(transaction=False) as pipe:  # type: ignore
+            for feature in features:
+                payload = orjson.dumps(feature)  # pylint: disable=no-member
+                size += len(payload)
+                pipe.set(
+                    f"{prefix}{CACHE_KEY_ITEM}:{feature['collection']}:{feature['id']}",
+                    payload,
+                    settings.redis_ttl,
+                )
+            payload = orjson.dumps(index)  # pylint: disable=no-member
+            size += len(payload)
+            pipe.set(cache_key, payload, settings.redis_ttl)
+            _register_search(
+                pipe, prefix, CACHE_KEY_SEARCH_INDEXES, cache_key, collections, settings.redis_ttl
+            )
+            with timed("cache"), child_span(
+                "redis.set", {"cache.keys": len(features) + 1, "cache.size": size}
+            ):
+                await pipe.execute()
     except Exception as e:  # pylint: disable=broad-exception-caught
         # Don't fail on redis failure
         logger.error(
@@ -143,9 +448,58 @@ async def cached_result(
         if settings.debug:
             raise
 
+    cache_stats.record(stats_key, hit=False, seconds=te - ts, size=size)
     return result
 
 
+async def invalidate(
+    cache_keys: List[str],
+    request: Request,
+    key_prefixes: Sequence[str] = (),
+    search_sets: Sequence[str] = (),
+    generations: Sequence[str] = (),
+) -> None:
+    """
+    Delete the given keys, the keys starting with the given prefixes (e.g. `/collections` for
+    all the cached collection pages) and the searches of the given sets (e.g.
+    `/search-indexes:{collection id}`) from the cache, and bump the generations of the given
+    resources (e.g. `items:{collection id}`) to drop the validators of their responses.
+    """
+    settings: Settings = request.app.state.settings
+    r: Redis = request.app.state.redis
+
+    prefix = f"{settings.stac_fastapi_landing_id}:"
+    try:
+        keys = [f"{prefix}{cache_key}" for cache_key in cache_keys]
+        for key_prefix in key_prefixes:
+            keys.extend([key async for key in r.scan_iter(match=f"{prefix}{key_prefix}:*")])
+        if search_sets:
+            set_keys = [f"{prefix}{search_set}" for search_set in search_sets]
+            async with r.pipeline(transaction=False) as pipe:  # type: ignore
+                for set_key in set_keys:
+                    pipe.zrange(set_key, 0, -1)
+                for members in await pipe.execute():
+                    keys.extend(members)
+            keys.extend(set_keys)
+        async with r.pipeline(transaction=False) as pipe:  # type: ignore
+            for key in keys:
+                pipe.delete(key)
+            for generation in generations:
+                pipe.incr(f"{prefix}{CACHE_KEY_GENERATION}:{generation}")
+            await pipe.execute()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Don't fail on redis failure
+        logger.error(
+            "DELETE cache: %s",
+            e,
+            extra=get_custom_dimensions(
+                {"cache_keys": cache_keys, "key_prefixes": key_prefixes}, request
+            ),
+        )
+        if settings.debug:
+            raise
+
+
 class RedisBaseItemCache(BaseItemCache):
     """
     Return the base item for the collection and cache by collection id.
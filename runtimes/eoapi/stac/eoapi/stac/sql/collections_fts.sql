@@ -0,0 +1,29 @@
+-- Full-text index of the collections for the free-text collection search (`q` parameter).
+-- Optional: once applied, the STAC API uses it instead of the unindexed full-text match of
+-- pgstac's collection_search. Apply it as the pgstac owner:
+--
+--   psql -f collections_fts.sql
+--
+-- Title matches rank before keywords matches, which rank before description matches.
+SET SEARCH_PATH TO pgstac, public;
+
+CREATE OR REPLACE FUNCTION collection_tsvector(content jsonb) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('english'::regconfig, coalesce(content->>'title', '')), 'A') ||
+        setweight(
+            to_tsvector(
+                'english'::regconfig,
+                coalesce(
+                    (SELECT string_agg(k, ' ') FROM jsonb_array_elements_text(
+                        CASE WHEN jsonb_typeof(content->'keywords') = 'array'
+                        THEN content->'keywords' ELSE '[]'::jsonb END
+                    ) k),
+                    ''
+                )
+            ),
+            'B'
+        ) ||
+        setweight(to_tsvector('english'::regconfig, coalesce(content->>'description', '')), 'C');
+$$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS collections_fts_idx ON collections USING GIN (collection_tsvector(content));
@@ -0,0 +1,46 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+SQL statements of the hot pgstac function calls.
+
+The statements take positional parameters instead of being rendered by buildpg on each call, which
+saves the rendering. asyncpg prepares each of them once per connection and then reuses the named
+prepared statement from the statement cache of the connection, as it did for the rendered text.
+"""
+
+COLLECTION_SEARCH = "SELECT * FROM collection_search($1::text::jsonb);"
+
+COLLECTION_SEARCH_ROWS = (
+    "SELECT coalesce(jsonb_agg(c), '[]') FROM collection_search_rows($1::text::jsonb) c;"
+)
+
+STAC_SEARCH_TO_WHERE = "SELECT stac_search_to_where($1::text::jsonb);"
+
+
+def search_cost(where: str) -> str:
+    """
+    `EXPLAIN` statement of an item search page, in pgstac default order, taking the limit as
+    parameter. The `WHERE` clause is built by pgstac (`STAC_SEARCH_TO_WHERE`) with quoted
+    literals. It is the only part of the text varying between searches, so the statement is to
+    be prepared apart from the statement cache of the connection, which would otherwise be
+    filled with single-use statements.
+    """
+    return (
+        f"EXPLAIN (FORMAT JSON) SELECT 1 FROM items WHERE {where} "
+        "ORDER BY datetime DESC LIMIT $1::int;"
+    )
@@ -0,0 +1,137 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache statistics of the instance."""
+
+import heapq
+from collections import Counter, defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple
+
+import attr
+
+# number of cache keys counted to find the most requested ones
+TOP_KEYS_CAPACITY = 200
+
+
+def cache_key_prefix(cache_key: str) -> str:
+    """Return the prefix of a cache key, i.e. one of the CACHE_KEY_* constants."""
+    return cache_key.split(":", 1)[0]
+
+
+class SpaceSaving:
+    """
+    Approximate counts of the most frequent keys, in bounded memory (space-saving algorithm).
+    The counts are overestimated by at most the count of the least frequent key.
+
+    The least frequent key is found with a min-heap of `(count, key)` entries. An entry is pushed
+    at each count change and the outdated ones are skipped when popped, the heap being rebuilt
+    from the counts when they outnumber the keys too much.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def _push(self, key: str) -> None:
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild()
+        heapq.heappush(self._heap, (self.counts[key], key))
+
+    def _rebuild(self) -> None:
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, key: str) -> Optional[str]:
+        """Count a key, return the key it replaced if any."""
+        if key in self.counts:
+            self.counts[key] += 1
+            self._push(key)
+            return None
+        if len(self.counts) < self.capacity:
+            self.counts[key] = 1
+            self._push(key)
+            return None
+
+        while True:
+            count, evicted = heapq.heappop(self._heap)
+            if self.counts.get(evicted) == count:
+                break
+        # the new key may have been seen as often as the evicted one
+        del self.counts[evicted]
+        self.counts[key] = count + 1
+        self._push(key)
+        return evicted
+
+    def top(self, n: int) -> List[str]:
+        """Return the `n` most frequent keys."""
+        return heapq.nlargest(n, self.counts, key=self.counts.__getitem__)
+
+    def decay(self) -> None:
+        """Halve the counts, forgetting the keys down to 0."""
+        self.counts = {key: count // 2 for key, count in self.counts.items() if count > 1}
+        self._rebuild()
+
+
+@attr.s
+class CacheStats:
+    """
+    Cache lookups by cache key prefix: hits and misses, time spent in the cache lookups of hits
+    and in the fetches of misses, bytes of the cached payloads read or written. The most looked up
+    keys are counted as well.
+    """
+
+    hits: Counter = attr.ib(factory=Counter)
+    misses: Counter = attr.ib(factory=Counter)
+    hit_seconds: DefaultDict[str, float] = attr.ib(factory=lambda: defaultdict(float))
+    miss_seconds: DefaultDict[str, float] = attr.ib(factory=lambda: defaultdict(float))
+    payload_bytes: Counter = attr.ib(factory=Counter)
+    keys: SpaceSaving = attr.ib(factory=lambda: SpaceSaving(TOP_KEYS_CAPACITY))
+
+    def record(self, cache_key: str, hit: bool, seconds: float = 0.0, size: int = 0) -> None:
+        """Record a cache lookup, with the duration of the lookup or fetch and the payload size."""
+        prefix = cache_key_prefix(cache_key)
+        if hit:
+            self.hits[prefix] += 1
+            self.hit_seconds[prefix] += seconds
+        else:
+            self.misses[prefix] += 1
+            self.miss_seconds[prefix] += seconds
+        self.payload_bytes[prefix] += size
+        self.keys.add(cache_key)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return hits, misses, hit ratio, mean durations and payload size by prefix."""
+        stats = {}
+        for prefix in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits[prefix], self.misses[prefix]
+            stats[prefix] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4),
+                "mean_hit_ms": round(self.hit_seconds[prefix] * 1000 / max(hits, 1), 3),
+                "mean_miss_ms": round(self.miss_seconds[prefix] * 1000 / max(misses, 1), 3),
+                "mean_payload_bytes": round(self.payload_bytes[prefix] / (hits + misses)),
+            }
+        return stats
+
+    def top_keys(self, n: int) -> List[Dict[str, Any]]:
+        """Return the `n` most looked up keys with their approximate lookup count."""
+        return [{"key": key, "lookups": self.keys.counts[key]} for key in self.keys.top(n)]
+
+
+cache_stats = CacheStats()
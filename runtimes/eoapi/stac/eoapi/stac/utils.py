@@ -19,10 +19,10 @@ from __future__ import annotations
 
 import json
 from typing import TYPE_CHECKING, Any
-from urllib.parse import urlparse
 
-from buildpg import render
+import orjson
 from stac_fastapi.types.stac import Collections
+from starlette.requests import Request as StarletteRequest
 
 from eoapi.stac.config import Settings
 from eoapi.stac.constants import (
@@ -30,6 +30,7 @@ from eoapi.stac.constants import (
     X_FORWARDED_FOR,
     X_ORIGINAL_FORWARDED_FOR,
 )
+from eoapi.stac.statements import COLLECTION_SEARCH
 
 if TYPE_CHECKING:
     from fastapi import Request
@@ -37,10 +38,17 @@ if TYPE_CHECKING:
 collections_list = Collections()
 
 
-def request_to_path(request: Request) -> str:
-    """Extract path from request URL."""
-    parsed_url = urlparse(str(request.url))
-    return parsed_url.path
+def sub_request(request: Request, path: str, body: Any) -> StarletteRequest:
+    """
+    Build a request sharing the scope, headers and state of the given request, but targeting
+    another path with the given JSON body. Used to run endpoints on behalf of a batch request
+    so that generated links (e.g. paging) point to the original endpoint.
+    """
+    scope = {**request.scope, "path": path, "raw_path": path.encode()}
+    new_request = StarletteRequest(scope)
+    new_request._body = orjson.dumps(body)  # pylint: disable=no-member
+    new_request._json = body
+    return new_request
 
 
 def get_request_ip(request: Request) -> str:
@@ -67,13 +75,9 @@ async def fetch_all_collections_with_scopes(request: Request) -> Collections:
     async def _fetch() -> Collections:
         search_request: dict[str, Any] = {"fields": {"include": ["id", "scope"]}, "limit": 100000}
         async with request.app.state.get_connection(request, "r") as conn:
-            q, p = render(
-                """
-                SELECT * FROM collection_search(:req::text::jsonb);
-                """,
-                req=json.dumps(search_request),
+            collections_result: Collections = await conn.fetchval(
+                COLLECTION_SEARCH, json.dumps(search_request)
             )
-            collections_result: Collections = await conn.fetchval(q, *p)
             return collections_result
 
     cache_key = f"{CACHE_KEY_COLLECTIONS}_all"
@@ -0,0 +1,164 @@
+# Copyright (c) 2025, CS GROUP - France, https://cs-soprasteria.com
+
+# This file is part of EO Catalog project:
+
+#     https://github.com/csgroup-oss/eo-catalog
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cache warm-up.
+
+The landing page, the first page of `/collections`, each collection, the queryables and a list of
+popular searches are requested in-process, at most `concurrency` at once, so that the cache is
+filled before the first wave of client requests. The requests go straight to the router, without
+the middlewares, with the public base URL of the API, since the cached responses hold links.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import SplitResult, urlsplit
+
+import orjson
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.types import Message, Scope
+
+from eoapi.stac.middlewares.server_timing import server_timing
+from eoapi.stac.middlewares.timeout import request_deadline
+from eoapi.stac.middlewares.tracing import untraced
+from eoapi.stac.utils import fetch_all_collections_with_scopes
+
+logger = logging.getLogger(__name__)
+
+
+def internal_scope(app: FastAPI, base_url: SplitResult, method: str, path: str) -> Scope:
+    """Scope of a request of the application to itself, as sent to `base_url`."""
+    root_path = app.root_path
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": base_url.scheme,
+        "server": (base_url.hostname, base_url.port or (443 if base_url.scheme == "https" else 80)),
+        "client": None,
+        "root_path": root_path,
+        "path": f"{root_path}{path}",
+        "raw_path": f"{root_path}{path}".encode(),
+        "query_string": b"",
+        "headers": [(b"host", base_url.netloc.encode()), (b"content-type", b"application/json")],
+        "app": app,
+    }
+
+
+class CacheWarmer:
+    """Warm the cache up, once at startup then again on demand, one run at a time."""
+
+    def __init__(
+        self,
+        app: FastAPI,
+        base_url: str,
+        searches: List[Dict[str, Any]],
+        concurrency: int,
+    ):
+        self.app = app
+        self.base_url = urlsplit(base_url)
+        self.searches = searches
+        self.concurrency = concurrency
+        # whether the first warm-up finished
+        self.ready = False
+        self._pending = False
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self) -> None:
+        """Warm the cache up in background, after the current run if any."""
+        if self._task is not None and not self._task.done():
+            self._pending = True
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        request_deadline.set(None)
+        server_timing.set(None)
+        untraced()
+        while True:
+            self._pending = False
+            try:
+                await self.warm_up()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Cache warm-up failed: %s", e)
+            self.ready = True
+            if not self._pending:
+                return
+
+    async def warm_up(self) -> None:
+        """Request the resources to cache."""
+        collections = await fetch_all_collections_with_scopes(
+            Request({"type": "http", "app": self.app})
+        )
+        collection_ids = [c["id"] for c in collections["collections"]]
+
+        requests: List[Tuple[str, str, Optional[bytes]]] = [
+            ("GET", "/", None),
+            ("GET", "/collections", None),
+            ("GET", "/queryables", None),
+        ]
+        for collection_id in collection_ids:
+            requests.append(("GET", f"/collections/{collection_id}", None))
+            requests.append(("GET", f"/collections/{collection_id}/queryables", None))
+        for search in self.searches:
+            requests.append(("POST", "/search", orjson.dumps(search)))  # pylint: disable=no-member
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _request(method: str, path: str, body: Optional[bytes]) -> bool:
+            async with semaphore:
+                try:
+                    return await self._request(method, path, body) == 200
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.warning("Cache warm-up of %s %s failed: %s", method, path, e)
+                    return False
+
+        ts = time.perf_counter()
+        results = await asyncio.gather(*(_request(*request) for request in requests))
+        logger.info(
+            "Cache warm-up: %d of %d resources in %.1fs",
+            sum(results),
+            len(results),
+            time.perf_counter() - ts,
+        )
+
+    async def _request(self, method: str, path: str, body: Optional[bytes]) -> int:
+        """Send a request to the router, return the response status."""
+        scope = internal_scope(self.app, self.base_url, method, path)
+        messages: List[Message] = [{"type": "http.request", "body": body or b""}]
+        status = 0
+
+        async def receive() -> Message:
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app.router(scope, receive, send)
+        return status
+
+    async def close(self) -> None:
+        """Cancel the current warm-up."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -6,7 +6,9 @@ from contextlib import asynccontextmanager
 import jinja2
 from eoapi.auth_utils import OpenIdConnectAuth, OpenIdConnectSettings
 from fastapi import FastAPI, Request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
 from starlette.templating import Jinja2Templates
 from starlette_cramjam.middleware import CompressionMiddleware
 from tipg.collections import register_collection_catalog
@@ -19,6 +21,8 @@ from tipg.settings import PostgresSettings
 from . import __version__ as eoapi_vector_version
 from .config import ApiSettings
 from .logs import init_logging
+from .metrics import EventLoopLagProbe, MetricsMiddleware, StatisticsCollector
+from .pool import InstrumentedPool
 
 try:
     from importlib.resources import files as resources_files  # type: ignore
@@ -65,6 +69,12 @@ async def lifespan(app: FastAPI):
         schemas=["pgstac", "public"],
         user_sql_files=list(CUSTOM_SQL_DIRECTORY.glob("*.sql")),  # type: ignore
     )
+    app.state.pool = InstrumentedPool(app.state.pool)
+
+    app.state.event_loop_lag_probe = EventLoopLagProbe(
+        block_threshold=settings.event_loop_block_threshold
+    )
+    app.state.event_loop_lag_probe.start()
 
     logger.debug("Registering collection catalog...")
     await register_collection_catalog(
@@ -79,6 +89,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await app.state.event_loop_lag_probe.close()
+
     # Close the Connection Pool
     logger.debug("Closing db connections...")
     await close_db_connection(app)
@@ -139,6 +151,8 @@ if settings.catalog_ttl:
         spatial=False,
     )
 
+app.add_middleware(MetricsMiddleware)
+
 add_exception_handlers(app, DEFAULT_STATUS_CODES)
 
 
@@ -154,6 +168,23 @@ def ping():
     return {"ping": "pong!"}
 
 
+@app.get("/_mgmt/pool", include_in_schema=False)
+async def pool_stats(request: Request):
+    """Connections and connection acquisitions of the database pool of the instance."""
+    return request.app.state.pool.statistics()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics of the instance."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+statistics_collector = StatisticsCollector()
+statistics_collector.add("vector_db_pool", None, lambda: app.state.pool.statistics())
+REGISTRY.register(statistics_collector)
+
+
 if settings.debug:
 
     @app.get("/rawcatalog", include_in_schema=False)
@@ -1,5 +1,9 @@
 """API settings."""
 
+from __future__ import annotations
+
+from typing import Optional
+
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
@@ -16,6 +20,10 @@ class ApiSettings(BaseSettings):
 
     catalog_ttl: int = 300
 
+    # log the stack and the route of the callbacks blocking the event loop longer
+    # than this duration in seconds
+    event_loop_block_threshold: Optional[float] = None
+
     model_config = {
         "env_prefix": "EOAPI_VECTOR_",
         "env_file": ".env",
@@ -0,0 +1,71 @@
+"""Database connection pool statistics."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import asyncpg
+from asyncpg import Connection
+
+
+class InstrumentedPool:
+    """
+    asyncpg pool recording the connection acquisitions.
+
+    asyncpg opens connections on demand up to `DB_MAX_CONN_SIZE` and closes the ones
+    idle for `DB_MAX_INACTIVE_CONN_LIFETIME` seconds, so the pool is only measured.
+    """
+
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+    @asynccontextmanager
+    async def acquire(
+        self, *, timeout: Optional[float] = None
+    ) -> AsyncIterator[Connection]:
+        """Acquire a connection from the pool."""
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        wait = time.perf_counter() - start
+        self.acquisitions += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn)
+
+    def statistics(self) -> Dict[str, Any]:
+        """Connections and connection acquisitions of the pool."""
+        pool = self._pool
+        return {
+            "size": pool.get_size(),
+            "max_size": pool.get_max_size(),
+            "in_use": pool.get_size() - pool.get_idle_size(),
+            "waiting": self.waiting,
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "mean_wait_seconds": round(
+                self.wait_seconds / max(self.acquisitions, 1), 6
+            ),
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+        }